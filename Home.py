@@ -1,7 +1,10 @@
 
 import streamlit as st
+from utils.warmup import warm_in_background
 
 st.set_page_config(page_title="🏠 Home", layout="wide")
+# Load and aggregate the workbook while the visitor reads this page
+warm_in_background()
 
 st.title("📊 Welcome to Financial Insights Dashboard")
 
@@ -12,6 +15,7 @@ This dashboard helps you analyze and visualize financial data month-over-month a
 - **Monthly Financial Statements**
 - **Yearly Summary**
 - **Dashboard**
+- **Consolidation** (one workbook per entity)
 
 Use the sidebar on the left to switch between views.
 """)
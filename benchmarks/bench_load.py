@@ -0,0 +1,54 @@
+"""Cold/warm load times of the trial balance: plain read_excel vs. the columnar sidecar.
+
+Usage: python benchmarks/bench_load.py [workbook] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.data_loader import DATA_FILE, load_trial_balance, sidecar_path
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("workbook", nargs="?", default=DATA_FILE)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def drop_sidecar():
+        if os.path.exists(sidecar_path(args.workbook)):
+            os.remove(sidecar_path(args.workbook))
+
+    def cold():
+        drop_sidecar()
+        load_trial_balance(args.workbook)
+
+    results = {
+        "pd.read_excel": best_of(lambda: pd.read_excel(args.workbook, parse_dates=["Date"]), args.repeat),
+        "sidecar cold (parse + write)": best_of(cold, args.repeat),
+        "sidecar warm (memory-mapped)": best_of(lambda: load_trial_balance(args.workbook), args.repeat),
+    }
+
+    rows = len(load_trial_balance(args.workbook))
+    print(f"{args.workbook}: {rows:,} rows, best of {args.repeat}")
+    baseline = results["pd.read_excel"]
+    for name, seconds in results.items():
+        print(f"  {name:<30} {seconds * 1000:10.1f} ms   {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
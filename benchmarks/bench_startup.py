@@ -0,0 +1,99 @@
+"""Cold-start cost of each page: time to first render in a fresh interpreter, with import breakdown.
+
+Every page runs in its own `python -X importtime` subprocess under Streamlit's AppTest. The
+import-time log is summed per top-level package (self time), so it shows what the first visit
+pays for beyond the data load. "via Home" first serves Home.py, lets its background warm-up
+finish, then renders the page, as a visitor landing on Home would.
+
+Usage: python benchmarks/bench_startup.py [--cold] [--top N] [--pages Home.py pages/1_Financials.py ...]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.data_loader import DATA_FILE, sidecar_path
+
+PAGES = ["Home.py", "pages/1_Financials.py", "pages/2_Yearly_Summary.py", "pages/3_Dashboard.py",
+         "pages/4_Consolidation.py"]
+
+# Runs inside the measured interpreter
+PROBE = """
+import json, sys, threading, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+page, via_home = sys.argv[1], sys.argv[2] == "1"
+warm = 0.0
+if via_home:
+    AppTest.from_file("Home.py", default_timeout=300).run()
+    # The warm-up starts the statement precompute when it finishes; wait for both
+    while True:
+        busy = [t for t in threading.enumerate() if t.name in ("data-warmup", "statement-precompute")]
+        if not busy:
+            break
+        busy[0].join()
+    warm = time.perf_counter() - imported
+    imported = time.perf_counter()
+at = AppTest.from_file(page, default_timeout=300)
+at.run()
+print(json.dumps({"streamlit_import": imported - start - warm,
+                  "warm_up": warm, "first_render": time.perf_counter() - imported,
+                  "exceptions": [str(e.value) for e in at.exception]}))
+"""
+
+
+def import_breakdown(stderr):
+    # "import time: self [us] | cumulative | imported package"
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def measure(page, via_home):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE, page, "1" if via_home else "0"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, import_breakdown(result.stderr)
+
+
+def drop_sidecar(workbook):
+    # Only the workbook's sidecar; the ledger store, timing log and profiles stay
+    if os.path.exists(sidecar_path(workbook)):
+        os.remove(sidecar_path(workbook))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--cold", action="store_true", help="drop the workbook's sidecar before every run")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for page in args.pages:
+        for via_home in ([False, True] if page != "Home.py" else [False]):
+            if args.cold:
+                drop_sidecar(os.path.join(ROOT, DATA_FILE))
+            timings, imports = measure(page, via_home)
+            label = f"{page} (via Home)" if via_home else page
+            print(f"{label:<40} first render {timings['first_render'] * 1000:8.0f} ms"
+                  f"   streamlit import {timings['streamlit_import'] * 1000:6.0f} ms"
+                  + (f"   warm-up {timings['warm_up'] * 1000:6.0f} ms" if via_home else "")
+                  + (f"   EXCEPTIONS {timings['exceptions']}" if timings["exceptions"] else ""))
+            if not via_home:
+                print("    " + ", ".join(f"{name} {us / 1000:.0f} ms" for name, us in imports[:args.top]))
+
+
+if __name__ == "__main__":
+    main()
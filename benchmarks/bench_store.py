@@ -0,0 +1,75 @@
+"""SQLite ledger store (utils/ledger_store.py) vs. the in-memory pandas path on synthetic ledgers.
+
+Times the full and incremental (one appended month) imports, and one month pair's statements
+answered by SQL pushdown vs. by pandas from the ledger and from an already built cube.
+
+Usage: python benchmarks/bench_store.py [--scales 1e4 1e5 1e6] [--accounts N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import timed
+from benchmarks.synthetic_ledger import generate_ledger
+from utils.aggregates import build_monthly_cube
+from utils.balances import build_balance_index
+from utils.data_loader import normalize_dtypes
+from utils.ledger_store import (import_ledger, open_store, store_balances_as_of, store_period_totals,
+                                store_statements)
+from utils.statements import available_periods, balance_sheet, income_statement, statements
+
+
+def bench_scale(lines, accounts, years, repeat):
+    ledger = normalize_dtypes(generate_ledger(years, accounts, max(int(lines) // (years * 12), 2)))
+    last_month = ledger["Date"].dt.to_period("M") == ledger["Date"].max().to_period("M")
+    earlier = ledger[~last_month]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = os.path.join(tmp, "ledger.csv")
+        con = open_store(workbook)
+        results["import (full)"] = timed(lambda: (import_ledger(con, ledger.iloc[:0]), import_ledger(con, earlier)), 1)
+        results["import (append one month)"] = timed(lambda: import_ledger(con, ledger), 1)
+
+        cube = build_monthly_cube(ledger)
+        balances = build_balance_index(cube)
+        months = available_periods(cube)
+        current, previous = months[-1], months[-2]
+
+        results["sqlite: balance sheet + income totals"] = timed(
+            lambda: [store_balances_as_of(con, p) for p in (current, previous)]
+            + [store_period_totals(con, p) for p in (current, previous)], repeat)
+        results["sqlite: statements"] = timed(lambda: store_statements(con, current, previous), repeat)
+        results["pandas: balance sheet + income (cube built)"] = timed(
+            lambda: (balance_sheet(balances, current, previous), income_statement(cube, current, previous)), repeat)
+        results["pandas: statements (cube built)"] = timed(
+            lambda: statements(cube, balances, current, previous), repeat)
+
+        def from_ledger():
+            built = build_monthly_cube(ledger)
+            statements(built, build_balance_index(built), current, previous)
+        results["pandas: statements (from ledger)"] = timed(from_ledger, repeat)
+        con.close()
+    return len(ledger), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", nargs="+", type=float, default=[1e4, 1e5, 1e6])
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        rows, results = bench_scale(scale, args.accounts, args.years, args.repeat)
+        print(f"{rows:>12,} lines")
+        for step, seconds in results.items():
+            print(f"    {step:<48} {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
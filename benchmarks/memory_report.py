@@ -0,0 +1,35 @@
+"""Memory of the ledger as get_trial_balance holds it vs the compact layout (utils/compact_ledger.py).
+
+Usage: python benchmarks/memory_report.py [WORKBOOK] [--synthetic LINES]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_ledger import generate_ledger
+from utils.compact_ledger import memory_report
+from utils.data_loader import DATA_FILE, load_trial_balance, normalize_dtypes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("workbook", nargs="?", default=DATA_FILE)
+    parser.add_argument("--synthetic", type=float, help="report on a generated ledger of about this many lines")
+    parser.add_argument("--accounts", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        ledger = normalize_dtypes(generate_ledger(3, args.accounts, max(int(args.synthetic) // 36, 2)))
+    else:
+        ledger = load_trial_balance(args.workbook, use_sidecar=False)
+    report = memory_report(ledger)
+    print(f"{len(ledger):,} journal lines{'':<14}{'Held (bytes)':>14} {'Compact (bytes)':>15} {'Saved':>8}")
+    for column, row in report.iterrows():
+        saved = "" if row["Saved"] != row["Saved"] else f"{row['Saved']:.1f}%"
+        print(f"    {column:<32} {int(row['Held (bytes)']):>14,} {int(row['Compact (bytes)']):>15,} {saved:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Time the load, aggregation and statement paths on synthetic ledgers of several sizes.
+
+Results are written as JSON; pass --compare OLD.json to print the ratio against an earlier run.
+
+Usage: python benchmarks/run_benchmarks.py [--scales 1e4 1e5 1e6] [--out FILE] [--compare OLD.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_ledger import generate_ledger, write_ledger
+from utils.aggregates import build_monthly_cube, rolling_totals
+from utils.balances import build_balance_index
+from utils.cashflow_logic import compute_cash_flow_statement
+from utils.dashboard_data import metric_series, window_pivot
+from utils.data_loader import load_trial_balance, normalize_dtypes
+from utils.statements import balance_sheet, income_statement, multi_period
+from utils.streaming_ingest import stream_monthly_cube
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_scale(lines, accounts, years, repeat, max_xlsx_rows):
+    lines_per_month = max(int(lines) // (years * 12), 2)
+    ledger = normalize_dtypes(generate_ledger(years, accounts, lines_per_month))
+    results = {}
+
+    if len(ledger) <= max_xlsx_rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.xlsx")
+            write_ledger(ledger, path)
+            results["load_trial_balance (xlsx)"] = timed(lambda: load_trial_balance(path, use_sidecar=False), 1)
+            load_trial_balance(path)
+            results["load_trial_balance (sidecar)"] = timed(lambda: load_trial_balance(path), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ledger.csv")
+        write_ledger(ledger, path)
+        results["stream_monthly_cube (csv)"] = timed(lambda: stream_monthly_cube(path), 1)
+
+    results["build_monthly_cube"] = timed(lambda: build_monthly_cube(ledger), repeat)
+    cube = build_monthly_cube(ledger)
+    results["build_balance_index"] = timed(lambda: build_balance_index(cube), repeat)
+    balances = build_balance_index(cube)
+
+    months = sorted(cube["Month"].unique())
+    current, previous = months[-1], months[-2]
+    results["balance_sheet"] = timed(lambda: balance_sheet(balances, current, previous), repeat)
+    results["income_statement"] = timed(lambda: income_statement(cube, current, previous), repeat)
+    results["compute_cash_flow_statement"] = timed(
+        lambda: compute_cash_flow_statement(cube, current, previous, balances=balances), repeat)
+    results["compute_cash_flow_statement (annual)"] = timed(
+        lambda: compute_cash_flow_statement(cube, current.year, current.year - 1, is_annual=True,
+                                            balances=balances), repeat)
+    results["rolling_totals (12 months)"] = timed(lambda: rolling_totals(cube, current, 12), repeat)
+    results["multi_period (12 months)"] = timed(lambda: multi_period(cube, balances, months[-12:]), repeat)
+    results["dashboard_aggregation"] = timed(lambda: metric_series(window_pivot(cube)), repeat)
+    return len(ledger), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", nargs="+", type=float, default=[1e4, 1e5, 1e6])
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-xlsx-rows", type=int, default=100_000,
+                        help="skip the workbook load timings above this many lines (openpyxl is slow to write)")
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    runs = []
+    for scale in args.scales:
+        rows, results = bench_scale(scale, args.accounts, args.years, args.repeat, args.max_xlsx_rows)
+        print(f"{rows:>12,} lines")
+        for step, seconds in results.items():
+            print(f"    {step:<42} {seconds * 1000:10.1f} ms")
+        runs.append({"rows": rows, "accounts": args.accounts, "years": args.years, "seconds": results})
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "runs": runs,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {run["rows"]: run["seconds"] for run in json.load(f)["runs"]}
+        print(f"Ratio against {args.compare} (>1 is slower now):")
+        for run in runs:
+            for step, seconds in run["seconds"].items():
+                before = baseline.get(run["rows"], {}).get(step)
+                if before:
+                    print(f"    {run['rows']:>12,} {step:<42} {seconds / before:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
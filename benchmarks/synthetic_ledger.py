@@ -0,0 +1,88 @@
+"""Synthetic trial balance with the workbook's schema, for benchmarking at any scale.
+
+Usage: python benchmarks/synthetic_ledger.py OUT.(xlsx|csv) [--years N] [--accounts N] [--lines-per-month N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import category_map
+
+# Accounts the pages and dashboard look up by name come first
+NAMED_ACCOUNTS = [
+    ("Cash at Bank", "Asset"),
+    ("Cash", "Asset"),
+    ("Accounts Receivable", "Asset"),
+    ("Investments", "Asset"),
+    ("Accounts Payable", "Liability"),
+    ("Common Stock", "Equity"),
+    ("Service Revenue", "Revenue"),
+    ("Salaries Expense", "Expense"),
+    ("Net Income", "Cash Flow Operating"),
+    ("Loans Given", "Cash Flow Operating"),
+    ("Purchase of Equipment", "Cash Flow Investing"),
+    ("Loan Proceeds", "Cash Flow Financing"),
+]
+
+
+def chart_of_accounts(accounts):
+    types = list(category_map)
+    chart = NAMED_ACCOUNTS[:accounts]
+    for i in range(len(chart), accounts):
+        account_type = types[i % len(types)]
+        chart.append((f"{account_type} {i:05d}", account_type))
+    return pd.DataFrame(chart, columns=["Account Name", "Account Type"])
+
+
+def generate_ledger(years=2, accounts=50, lines_per_month=1000, start="2024-01", seed=0):
+    """Balanced journal: every entry debits one account and credits another by the same amount."""
+    rng = np.random.default_rng(seed)
+    chart = chart_of_accounts(accounts)
+    month_ends = pd.period_range(start, periods=years * 12, freq="M").to_timestamp(how="end").normalize()
+
+    entries = max(lines_per_month // 2, 1) * len(month_ends)
+    dates = np.repeat(month_ends.to_numpy(), max(lines_per_month // 2, 1))
+    amounts = np.round(rng.lognormal(mean=8, sigma=1.5, size=entries), 2)
+    debit_accounts = rng.integers(0, len(chart), size=entries)
+    credit_accounts = (debit_accounts + rng.integers(1, max(len(chart), 2), size=entries)) % len(chart)
+
+    ledger = pd.DataFrame({
+        "Date": np.concatenate([dates, dates]),
+        "Account Name": np.concatenate([chart["Account Name"].to_numpy()[debit_accounts],
+                                        chart["Account Name"].to_numpy()[credit_accounts]]),
+        "Account Type": np.concatenate([chart["Account Type"].to_numpy()[debit_accounts],
+                                        chart["Account Type"].to_numpy()[credit_accounts]]),
+        "Debit": np.concatenate([amounts, np.zeros(entries)]),
+        "Credit": np.concatenate([np.zeros(entries), amounts]),
+    })
+    return ledger.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def write_ledger(ledger, path):
+    if path.endswith(".csv"):
+        ledger.to_csv(path, index=False)
+    else:
+        ledger.to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--lines-per-month", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ledger = generate_ledger(args.years, args.accounts, args.lines_per_month, seed=args.seed)
+    write_ledger(ledger, args.out)
+    print(f"Wrote {len(ledger):,} journal lines to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
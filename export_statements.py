@@ -0,0 +1,114 @@
+"""Batch export of the balance sheet, income statement and cash flow for every period of a workbook.
+
+Each period is compared with the one before it, exactly as the Financials / Yearly pages show it.
+Periods are spread over a process pool; each worker loads the workbook once (through the sidecar
+cache) and reuses its cube and balance index for all the periods it is given.
+
+With --pack, the periods are instead gathered into one month-end pack (a multi-sheet XLSX, a
+static HTML page and a PDF) written to the output directory.
+
+Usage: python export_statements.py [workbook] [--out DIR] [--format csv xlsx html] [--annual] [--workers N] [--store]
+       python export_statements.py [workbook] --pack [--last N] [--annual] [--out DIR]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from openpyxl import Workbook
+
+from utils.data_loader import DATA_FILE, get_balance_index, get_monthly_cube
+from utils.export_pack import PACK_FORMATS, WRITERS, append_statement, pack_pairs, pack_statements, plain_text
+from utils.html_render import STYLESHEET, table_markup
+from utils.ledger_store import open_store, store_path, store_statements, sync_store
+from utils.statement_table import display_table
+from utils.statements import available_periods, statements
+
+FORMATS = ["csv", "xlsx", "html"]
+
+
+def write_tables(tables, out_dir, name, formats):
+    if "csv" in formats:
+        for title, table in tables.items():
+            # Amounts in rupees and % changes in percent, as numbers
+            plain_text(table).to_csv(os.path.join(out_dir, f"{name} {title}.csv"), index=False, float_format="%.2f")
+    if "xlsx" in formats:
+        workbook = Workbook(write_only=True)
+        for title, table in tables.items():
+            append_statement(workbook.create_sheet(title=title), table)
+        workbook.save(os.path.join(out_dir, f"{name}.xlsx"))
+    if "html" in formats:
+        body = "".join(f"<h2>{title}</h2>{table_markup(display_table(table))}" for title, table in tables.items())
+        with open(os.path.join(out_dir, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>{name}</title>{STYLESHEET}</head>"
+                    f"<body>{body}</body></html>")
+
+
+def export_period(job):
+    workbook, current, previous, annual, out_dir, formats, use_store = job
+    if use_store:
+        con = open_store(workbook)
+        try:
+            tables = store_statements(con, current, previous, annual=annual)
+        finally:
+            con.close()
+    else:
+        tables = statements(get_monthly_cube(workbook), get_balance_index(workbook), current, previous, annual=annual)
+    write_tables(tables, out_dir, str(current), formats)
+    return sum(len(table) for table in tables.values())
+
+
+def export_pack_files(args, periods):
+    first = max(1, len(periods) - args.last) if args.last else 1
+    pairs = pack_pairs(periods, periods[min(first, len(periods) - 1)], periods[-1])
+    pack = pack_statements(pairs, annual=args.annual, path=args.workbook, workers=args.workers)
+    name = "pack annual" if args.annual else "pack"
+
+    def write(fmt):
+        with open(os.path.join(args.out, f"{name}.{fmt}"), "wb") as f:
+            WRITERS[fmt](pack, f)
+
+    with ThreadPoolExecutor(max_workers=len(PACK_FORMATS)) as pool:
+        list(pool.map(write, PACK_FORMATS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workbook", nargs="?", default=DATA_FILE)
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--annual", action="store_true", help="export years instead of months")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--store", action="store_true",
+                        help="answer the statement queries from the SQLite ledger store (imported incrementally)")
+    parser.add_argument("--pack", action="store_true", help="write one XLSX / HTML / PDF pack instead")
+    parser.add_argument("--last", type=int, help="with --pack: only the last N periods")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    cube = get_monthly_cube(args.workbook)
+    periods = available_periods(cube, annual=args.annual)
+    if args.pack:
+        export_pack_files(args, periods)
+        print(f"Wrote the pack to {args.out}/ in {time.perf_counter() - start:.2f}s")
+        return
+    if args.store:
+        con, mode = sync_store(args.workbook)
+        con.close()
+        print(f"Ledger store {store_path(args.workbook)}: {mode}")
+    jobs = [(args.workbook, current, previous, args.annual, args.out, args.format, args.store)
+            for previous, current in zip(periods, periods[1:])]
+
+    # Counted from the cube, so a streamed workbook is never loaded whole just for the rate
+    ledger_rows = int(cube["Lines"].sum())
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        statement_rows = sum(pool.map(export_period, jobs))
+    elapsed = time.perf_counter() - start
+
+    print(f"Exported {len(jobs)} periods to {args.out}/ in {elapsed:.2f}s "
+          f"({ledger_rows / elapsed:,.0f} journal rows/s, {statement_rows / elapsed:,.0f} statement rows/s)")
+
+
+if __name__ == "__main__":
+    main()
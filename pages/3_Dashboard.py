@@ -1,37 +1,28 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils.shared_formatting import load_trial_balance
+from utils.charts import line_chart_png
+from utils.dashboard_data import METRICS, WINDOW_MONTHS, dashboard_series, month_labels
+from utils.shared_formatting import timing_panel
 
 st.set_page_config(page_title="📊 Dashboard", layout="wide")
-st.title("📊 Rolling 15-Month Financial Dashboard")
+with timing_panel("Dashboard"):
 
-df = load_trial_balance()
-df["Month"] = df["Date"].dt.to_period("M")
-df["Month Label"] = df["Date"].dt.strftime("%b-%y")
-df["Amount"] = df["Debit"] - df["Credit"]
+    window = st.sidebar.slider("Months", min_value=3, max_value=36, value=WINDOW_MONTHS)
+    # Native charts are drawn by the browser (Vega-Lite), so nothing is rasterized on the server
+    native = st.sidebar.checkbox("Interactive charts", value=False)
+    st.title(f"📊 Rolling {window}-Month Financial Dashboard")
 
-month_range = sorted(df["Month"].unique())[-15:]
-df_subset = df[df["Month"].isin(month_range)]
+    series = dashboard_series(months=window, metrics=METRICS)
+    labels = month_labels(series.index)
 
-metrics = {
-    "Cash": ["Cash", "Cash at Bank"],
-    "Revenue": ["Service Revenue"],
-    "Expenses": ["Salaries Expense"],
-    "Net Assets": ["Cash", "Accounts Receivable", "Investments", "Accounts Payable"],
-    "Investments": ["Investments"]
-}
-
-# Arrange charts two per row
-rows = list(metrics.items())
-for i in range(0, len(rows), 2):
-    cols = st.columns(2)
-    for idx, (metric, accounts) in enumerate(rows[i:i+2]):
-        subset = df_subset[df_subset["Account Name"].isin(accounts)]
-        chart_data = subset.groupby("Month Label")["Amount"].sum().reset_index()
-        with cols[idx]:
-            plt.figure(figsize=(5, 3))
-            plt.plot(chart_data["Month Label"], chart_data["Amount"], marker="o")
-            plt.title(metric)
-            plt.xticks(rotation=45)
-            st.pyplot(plt)
\ No newline at end of file
+    # Arrange charts two per row
+    rows = list(series.columns)
+    for i in range(0, len(rows), 2):
+        cols = st.columns(2)
+        for idx, metric in enumerate(rows[i:i+2]):
+            with cols[idx]:
+                if native:
+                    st.markdown(f"**{metric}**")
+                    # Month-start timestamps keep the x-axis in date order
+                    st.line_chart(series[[metric]].set_axis(series.index.to_timestamp(), axis=0))
+                else:
+                    st.image(line_chart_png(metric, labels, series[metric].to_numpy()))
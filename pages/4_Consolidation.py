@@ -0,0 +1,52 @@
+import streamlit as st
+import os
+from utils.aggregates import period_label
+from utils.consolidation import CONSOLIDATED, ENTITIES_DIR, consolidate, entity_workbooks
+from utils.html_render import render_statement, render_table
+from utils.shared_formatting import timing_panel
+from utils.statements import available_periods, statements
+
+st.set_page_config(page_title="🏢 Consolidation", layout="wide")
+with timing_panel("Consolidation"):
+    st.markdown("## 🏢 Consolidated Financial Statements")
+
+    source = st.sidebar.text_input("Entities folder or pattern", ENTITIES_DIR,
+                                   help="e.g. entities/ or ledgers/tb_*.xlsx")
+    if not entity_workbooks(source):
+        st.info(f"Put one trial-balance workbook per entity in '{source}/' to consolidate them.")
+        st.stop()
+
+    # Workbooks are parsed in parallel; the bar moves as each one finishes
+    bar, note = st.progress(0.0), st.empty()
+
+    def show_progress(done, total, path):
+        bar.progress(done / total)
+        note.caption(f"Loaded {os.path.basename(path)} ({done}/{total})")
+
+    group = consolidate(source, progress=show_progress)
+    bar.empty()
+    note.empty()
+
+    entity = st.sidebar.selectbox("Entity", [CONSOLIDATED] + [e for e in group["cubes"] if e != CONSOLIDATED])
+    annual = st.sidebar.radio("Periods", ["Months", "Years"], horizontal=True) == "Years"
+    cube = group["cubes"][entity]
+    periods = available_periods(group["cubes"][CONSOLIDATED], annual=annual)
+    if len(periods) < 2:
+        st.info("At least two periods are needed for a comparison.")
+        st.stop()
+    current = st.sidebar.selectbox("Current", periods[::-1], format_func=period_label)
+    previous = st.sidebar.selectbox("Previous", [p for p in periods if p < current][::-1], format_func=period_label)
+
+    # ---------------- DISPLAY ----------------
+    tables = statements(cube, group["balances"][entity], current, previous, annual=annual)
+    render_statement("Balance Sheet", tables["Balance Sheet"])
+    render_statement("Income Statement", tables["Income Statement"])
+    st.markdown("### Cash Flow Statement")
+    render_table(tables["Cash Flow Statement"])
+
+    # ---------------- ELIMINATIONS ----------------
+    if entity == CONSOLIDATED and not group["eliminations"].empty:
+        st.markdown("### Unmatched Intercompany Balances")
+        st.caption("Only the offsetting amounts are eliminated; these differences remain in the consolidated statements.")
+        report = group["eliminations"]
+        st.dataframe(report.assign(Month=report["Month"].map(period_label)))
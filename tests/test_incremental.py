@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.synthetic_ledger import generate_ledger
+from utils.data_loader import get_monthly_cube, normalize_dtypes
+from utils.incremental import fingerprint, is_append
+from utils.ledger_store import SCHEMA, import_ledger, store_period_totals
+
+
+@pytest.fixture
+def ledger():
+    return normalize_dtypes(generate_ledger(2, 50, 400))
+
+
+def state_of(ledger):
+    return {"rows": len(ledger), "checksum": fingerprint(ledger, len(ledger)),
+            "high_water_date": ledger["Date"].max().isoformat()}
+
+
+def edit_middle(ledger, amount=1_000_000):
+    edited = ledger.copy()
+    edited.loc[len(edited) // 2, "Debit"] += amount
+    return edited
+
+
+def test_append_is_recognised(ledger):
+    head = ledger[ledger["Date"] < ledger["Date"].max().to_period("M").start_time]
+    assert is_append(state_of(head), ledger)
+
+
+def test_mid_ledger_edit_is_not_an_append(ledger):
+    assert not is_append(state_of(ledger), edit_middle(ledger))
+
+
+def test_store_rebuilds_after_mid_ledger_edit(ledger):
+    con = sqlite3.connect(":memory:")
+    con.executescript(SCHEMA)
+    assert import_ledger(con, ledger) == "rebuild"
+    assert import_ledger(con, ledger) == "unchanged"
+    edited = edit_middle(ledger)
+    assert import_ledger(con, edited) == "rebuild"
+    year = int(edited["Date"].dt.year.min())
+    expected = edited.loc[edited["Date"].dt.year == year, "Debit"].sum()
+    assert store_period_totals(con, year)["Debit"].sum() == pytest.approx(expected)
+
+
+def test_cube_follows_mid_ledger_edit(ledger, tmp_path):
+    path = str(tmp_path / "ledger.csv")
+    ledger.to_csv(path, index=False)
+    before = get_monthly_cube(path)["Debit"].sum()
+    edit_middle(ledger).to_csv(path, index=False)
+    assert get_monthly_cube(path)["Debit"].sum() == pytest.approx(before + 1_000_000)
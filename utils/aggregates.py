@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from utils.compact_ledger import compact_ledger, month_ordinals
+
+category_map = {
+    "Asset": "Assets",
+    "Liability": "Liabilities",
+    "Equity": "Equity",
+    "Revenue": "Revenue",
+    "Expense": "Expenses",
+    "Cash Flow Operating": "Operating Activities",
+    "Cash Flow Investing": "Investing Activities",
+    "Cash Flow Financing": "Financing Activities"
+}
+
+ACCOUNT_KEYS = ["Account Category", "Account Type", "Account Name"]
+AMOUNTS = ["Debit", "Credit", "Net"]
+# Lines counts the journal lines behind each cube cell, so "no activity" differs from "nets to zero"
+CUBE_VALUES = AMOUNTS + ["Lines"]
+CUBE_KEYS = ["Month", "Account Type", "Account Name"]
+
+
+# ---------------- MONTHLY CUBE ----------------
+def build_monthly_cube(df):
+    """One row per (month, account) with summed Debit, Credit and Net = Debit - Credit.
+
+    The sums run on integer keys (month x account id) over paise amounts from the compact
+    ledger; names are attached once per cube row afterwards.
+    """
+    return cube_from_compact(*compact_ledger(df))
+
+
+def cube_from_compact(facts, accounts):
+    width = max(len(accounts), 1)
+    # Lines without a date belong to no month
+    month, valid = month_ordinals(facts["Date"])
+    first = month[valid].min() if valid.any() else 0
+    key = (month[valid] - first) * width + facts["Account ID"].to_numpy()[valid]
+    # Keys are dense (months x accounts), so the sums are bincounts; paise are exact in float64
+    lines = np.bincount(key)
+    keys = np.flatnonzero(lines)
+    debit = np.bincount(key, weights=facts["Debit Paise"].to_numpy()[valid])[keys]
+    credit = np.bincount(key, weights=facts["Credit Paise"].to_numpy()[valid])[keys]
+    account_id = keys % width
+    cube = pd.DataFrame({
+        "Month": pd.PeriodIndex(pd.Period("1970-01", freq="M") + (keys // width + first), freq="M"),
+        "Account Type": accounts["Account Type"].to_numpy().take(account_id),
+        "Account Name": accounts["Account Name"].to_numpy().take(account_id),
+        "Debit": debit / 100,
+        "Credit": credit / 100,
+        "Lines": lines[keys],
+    })
+    return _finish_cube(cube)
+
+
+def combine_cubes(cubes):
+    """Sum monthly cubes built from separate slices of a ledger (chunks, appended rows, files)."""
+    stacked = pd.concat([c[CUBE_KEYS + ["Debit", "Credit", "Lines"]].astype({"Account Type": object, "Account Name": object})
+                         for c in cubes], ignore_index=True)
+    cube = stacked.groupby(CUBE_KEYS, dropna=False)[["Debit", "Credit", "Lines"]].sum().reset_index()
+    return _finish_cube(cube)
+
+
+def _finish_cube(cube):
+    cube["Account Type"] = cube["Account Type"].astype("category")
+    cube["Account Name"] = cube["Account Name"].astype("category")
+    cube["Account Category"] = cube["Account Type"].map(category_map)
+    cube["Net"] = cube["Debit"] - cube["Credit"]
+    return cube[["Month"] + ACCOUNT_KEYS + CUBE_VALUES]
+
+
+def _period_mask(cube, period):
+    if isinstance(period, pd.Period):
+        if period.freqstr.startswith("M"):
+            return cube["Month"] == period
+        starts = cube["Month"].dt.start_time
+        return (starts >= period.start_time) & (starts <= period.end_time)
+    # Plain integers are calendar years
+    return cube["Month"].dt.year == int(period)
+
+
+def period_months(period):
+    """First and last month (Period[M] ordinals) of a month/quarter/year Period or an int year."""
+    if isinstance(period, pd.Period):
+        return period.asfreq("M", how="start").ordinal, period.asfreq("M", how="end").ordinal
+    year = int(period)
+    return pd.Period(year=year, month=1, freq="M").ordinal, pd.Period(year=year, month=12, freq="M").ordinal
+
+
+def period_totals(cube, period):
+    """Per-account totals for a month, quarter or year (Period or int year)."""
+    return sum_months(cube[_period_mask(cube, period)])
+
+
+def rolling_totals(cube, end_month, months):
+    start = end_month - (months - 1)
+    return sum_months(cube[(cube["Month"] >= start) & (cube["Month"] <= end_month)])
+
+
+def sum_months(cube_slice):
+    return cube_slice.groupby(ACCOUNT_KEYS, observed=True, dropna=False)[CUBE_VALUES].sum().reset_index()
+
+
+def totals_by_period(cube, periods, annual=False):
+    """Per-account totals for several periods in one groupby.
+
+    Periods are months, or calendar years when `annual`. Columns are (value, period) for
+    every value in CUBE_VALUES, with zeros where an account had no activity in a period.
+    """
+    key = cube["Month"].dt.year if annual else cube["Month"]
+    selected = key.isin(periods)
+    wide = (
+        cube[selected]
+        .assign(Period=key[selected])
+        .groupby(["Period"] + ACCOUNT_KEYS, observed=True, dropna=False)[CUBE_VALUES]
+        .sum()
+        .unstack("Period", fill_value=0)
+    )
+    return wide.reindex(columns=pd.MultiIndex.from_product([CUBE_VALUES, list(periods)]), fill_value=0)
+
+
+def period_label(period):
+    if isinstance(period, pd.Period):
+        return pd.Timestamp(period.start_time).strftime('%b %Y')
+    return str(period)
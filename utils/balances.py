@@ -0,0 +1,64 @@
+import pandas as pd
+
+from utils.aggregates import ACCOUNT_KEYS
+from utils.profiling import timed
+
+
+# ---------------- RUNNING BALANCE INDEX ----------------
+@timed("aggregate: balance index")
+def build_balance_index(cube):
+    """Cumulative Net and Lines per account at the end of every month of the cube.
+
+    Columns are (value, month) over the full month range without gaps, so a balance
+    "as of" any period is a single column lookup. Rows are sorted by account name first
+    so that a single account is a keyed lookup as well.
+    """
+    months = pd.period_range(cube["Month"].min(), cube["Month"].max(), freq="M")
+    rows = ["Account Name"] + [k for k in ACCOUNT_KEYS if k != "Account Name"]
+    monthly = cube.groupby(rows + ["Month"], observed=True, dropna=False)[["Net", "Lines"]].sum()
+    running = {}
+    for value in ["Net", "Lines"]:
+        wide = monthly[value].unstack("Month", fill_value=0)
+        running[value] = wide.reindex(columns=months, fill_value=0).cumsum(axis=1)
+    # Whole paise, so a long running sum does not drift below a rupee boundary
+    running["Net"] = running["Net"].round(2)
+    return pd.concat(running, axis=1).sort_index()
+
+
+def as_of_month(period):
+    # Month-end that closes `period`; plain integers are calendar years
+    if isinstance(period, pd.Period):
+        return period if period.freqstr.startswith("M") else period.asfreq("M", how="end")
+    return pd.Period(year=int(period), month=12, freq="M")
+
+
+def balances_as_of(index, period):
+    """Per-account cumulative Net/Lines at the end of `period`, only for accounts opened by then."""
+    months = index["Net"].columns
+    month = min(as_of_month(period), months[-1])
+    if month < months[0]:
+        values = pd.DataFrame({"Net": 0.0, "Lines": 0}, index=index.index)
+    else:
+        values = pd.DataFrame({"Net": index[("Net", month)], "Lines": index[("Lines", month)]})
+    return values[values["Lines"] > 0].reset_index()
+
+
+def account_balance(index, account_name, period):
+    months = index["Net"].columns
+    month = min(as_of_month(period), months[-1])
+    if month < months[0]:
+        return 0.0
+    try:
+        return float(index[("Net", month)].loc[account_name].sum())
+    except KeyError:
+        return 0.0
+
+
+def balances_as_of_periods(index, periods):
+    """Cumulative Net at the close of each period, one column per period, in one slice of the index."""
+    months = index["Net"].columns
+    closes = [min(as_of_month(p), months[-1]) for p in periods]
+    net = index["Net"].reindex(columns=closes, fill_value=0)
+    opened = (index["Lines"].reindex(columns=closes, fill_value=0) > 0).any(axis=1)
+    net.columns = list(periods)
+    return net[opened.to_numpy()].reset_index()
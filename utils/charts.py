@@ -0,0 +1,50 @@
+import hashlib
+import io
+
+import numpy as np
+
+from utils.lru import LRUCache
+from utils.profiling import timed
+
+CHART_CACHE_SIZE = 64
+FIGSIZE = (5, 3)
+
+# PNG bytes by data hash; shared by every session of the process
+_charts = LRUCache(CHART_CACHE_SIZE)
+
+
+def chart_key(title, labels, values, figsize=FIGSIZE):
+    digest = hashlib.sha1(np.asarray(values, dtype="float64").tobytes())
+    digest.update(repr((title, tuple(labels), tuple(figsize))).encode())
+    return digest.hexdigest()
+
+
+@timed("render: chart")
+def render_line_chart(title, labels, values, figsize=FIGSIZE):
+    """PNG of a line chart, drawn on a standalone Figure (no pyplot state) that is released afterwards."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    try:
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(list(labels), values, marker="o")
+        ax.set_title(title)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def line_chart_png(title, labels, values, figsize=FIGSIZE):
+    """render_line_chart, cached on the chart's data with LRU eviction beyond CHART_CACHE_SIZE."""
+    return _charts.get(chart_key(title, labels, values, figsize),
+                       lambda: render_line_chart(title, labels, values, figsize))
+
+
+def chart_cache_stats():
+    return _charts.stats()
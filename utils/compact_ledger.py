@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Compact ledger layout: one fact row per journal line referring to an account dimension by id.
+#   facts:    Date (datetime64), Account ID (int16, int32 past 32k accounts), Debit Paise / Credit Paise (int64)
+#   accounts: indexed by Account ID with categorical Account Name and Account Type
+
+
+def to_paise(amounts):
+    values = pd.to_numeric(amounts, errors="coerce")
+    values = np.asarray(values, dtype="float64")
+    return np.rint(np.nan_to_num(values * 100)).astype("int64")
+
+
+def as_datetime(dates):
+    if pd.api.types.is_datetime64_dtype(dates.dtype):
+        return dates.to_numpy()
+    return pd.to_datetime(dates).to_numpy()
+
+
+def month_ordinals(dates):
+    """Months since 1970-01 (the Period[M] ordinal, negative before 1970) per date, and a mask of
+    the dates that are present. Missing dates get ordinal 0, so always check the mask."""
+    # Ledgers carry few distinct dates, so convert those once and broadcast back
+    codes, distinct = pd.factorize(np.asarray(dates, dtype="datetime64[ns]"))
+    epoch = np.datetime64("1970-01", "M").astype("int64")
+    ordinals = np.asarray(distinct, dtype="datetime64[ns]").astype("datetime64[M]").astype("int64") - epoch
+    # Code -1 (missing) takes the trailing 0
+    return np.r_[ordinals, 0].take(codes), codes >= 0
+
+
+def compact_ledger(df):
+    """Split a loaded ledger into integer-coded facts and an account dimension table."""
+    types = pd.Categorical(df["Account Type"])
+    names = pd.Categorical(df["Account Name"])
+    # Code 0 is reserved for missing values so that every (type, name) pair gets an id
+    type_codes = types.codes.astype("int64") + 1
+    name_codes = names.codes.astype("int64") + 1
+    width = len(names.categories) + 1
+    account_id, pairs = pd.factorize(type_codes * width + name_codes, sort=True)
+
+    accounts = pd.DataFrame({
+        "Account Name": pd.Categorical.from_codes(pairs % width - 1, categories=names.categories),
+        "Account Type": pd.Categorical.from_codes(pairs // width - 1, categories=types.categories),
+    })
+    accounts.index.name = "Account ID"
+
+    facts = pd.DataFrame({
+        "Date": as_datetime(df["Date"]),
+        "Account ID": account_id.astype("int16" if len(pairs) < 2 ** 15 else "int32"),
+        "Debit Paise": to_paise(df["Debit"]),
+        "Credit Paise": to_paise(df["Credit"]),
+    })
+    return facts, accounts
+
+
+# ---------------- MEMORY REPORT ----------------
+def memory_report(df):
+    """Bytes per column of a loaded ledger, as the process cache holds it (categorical names,
+    float64 amounts, see utils.data_loader.normalize_dtypes), vs the compact layout."""
+    facts, accounts = compact_ledger(df)
+    before = df.memory_usage(deep=True, index=False)
+    after = pd.concat([facts.memory_usage(deep=True, index=False),
+                       accounts.memory_usage(deep=True, index=False).add_prefix("accounts: ")])
+    report = pd.DataFrame({"Held (bytes)": before, "Compact (bytes)": after}).fillna(0).astype("int64")
+    report.loc["Total"] = report.sum()
+    # Only columns present in both layouts compare
+    both = report.where(report > 0)
+    report["Saved"] = (1 - both["Compact (bytes)"] / both["Held (bytes)"]) * 100
+    return report
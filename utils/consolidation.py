@@ -0,0 +1,135 @@
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import CUBE_KEYS, combine_cubes
+from utils.balances import build_balance_index
+from utils.data_loader import expand_workbooks, file_signature, load_monthly_cubes
+from utils.profiling import timed
+
+# One trial-balance workbook per legal entity; the file name (without extension) names the entity
+ENTITIES_DIR = os.environ.get("TB_ENTITIES_DIR", "entities")
+WORKBOOK_EXTENSIONS = (".xlsx", ".csv")
+# Optional, in the entities directory: [{"name": "...", "accounts": ["Due from B", "Due to A"]}, ...]
+ELIMINATIONS_FILE = "eliminations.json"
+CONSOLIDATED = "Consolidated"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+# ---------------- ENTITIES ----------------
+def entity_workbooks(source=ENTITIES_DIR):
+    """Entity name -> workbook path for every workbook in a directory or matching a glob pattern
+    (Excel lock files skipped)."""
+    if glob.has_magic(source):
+        paths = [p for p in expand_workbooks(source) if p.lower().endswith(WORKBOOK_EXTENSIONS)]
+    elif os.path.isdir(source):
+        paths = expand_workbooks(os.path.join(glob.escape(source), "*"))
+        paths = [p for p in paths if p.lower().endswith(WORKBOOK_EXTENSIONS)]
+    else:
+        return {}
+    return {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+
+
+def rules_directory(source=ENTITIES_DIR):
+    # The eliminations file sits next to the workbooks
+    return source if not glob.has_magic(source) else os.path.dirname(source) or "."
+
+
+def read_elimination_rules(directory=ENTITIES_DIR):
+    try:
+        with open(os.path.join(directory, ELIMINATIONS_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def load_entity_cubes(workbooks, workers=None, progress=None):
+    """Monthly cube per entity; the workbooks are parsed concurrently in worker processes.
+
+    progress(done, total, path) is called as each workbook finishes.
+    """
+    cubes = load_monthly_cubes(list(workbooks.values()), workers, progress)
+    return {name: cubes[path] for name, path in workbooks.items()}
+
+
+# ---------------- CONSOLIDATION ----------------
+def eliminate(cube, rules):
+    """Net intercompany balances off against each other in a combined cube.
+
+    Each rule lists accounts whose combined balances across entities should cancel. At every month
+    end, only the amount that offsets in the rule's cumulative balances is eliminated, the
+    debit-balance and credit-balance accounts each pro rata; a posting that one side books a month
+    later cancels once both are in. The elimination is posted as monthly adjustments, so
+    whatever has not cancelled stays in the consolidated figures. The cumulative difference is
+    returned per rule and month, so mismatched intercompany postings are visible.
+    """
+    if not any(rule["accounts"] for rule in rules):
+        return cube, pd.DataFrame(columns=["Rule", "Month", "Difference"])
+    months = pd.period_range(cube["Month"].min(), cube["Month"].max(), freq="M", name="Month")
+    adjustments, residuals = [], []
+    for rule in rules:
+        matched = cube[cube["Account Name"].isin(rule["accounts"])]
+        balances = (matched.groupby(CUBE_KEYS, observed=True, dropna=False)["Net"].sum()
+                    .unstack("Month", fill_value=0).reindex(columns=months, fill_value=0).cumsum(axis=1))
+        b = balances.to_numpy()
+        debit_side, credit_side = b.clip(min=0).sum(axis=0), (-b).clip(min=0).sum(axis=0)
+        offset = np.minimum(debit_side, credit_side)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(b > 0, offset / debit_side, np.where(b < 0, offset / credit_side, 0))
+        # Cumulative elimination per account, posted as its month-on-month change: a reduction of
+        # a debit balance comes off Debit, of a credit balance off Credit
+        change = pd.DataFrame(np.diff(b * share, axis=1, prepend=0), index=balances.index, columns=months)
+        change = change.stack().rename("Change").reset_index()
+        change = change[change["Change"].round(2) != 0]
+        adjustments.append(change.assign(Debit=-change["Change"].clip(lower=0),
+                                         Credit=change["Change"].clip(upper=0), Lines=0))
+        difference = pd.Series(b.sum(axis=0), index=months)
+        difference = difference[difference.round(2) != 0]
+        residuals.append(pd.DataFrame({"Rule": rule.get("name", ", ".join(rule["accounts"])),
+                                       "Month": difference.index, "Difference": difference.to_numpy()}))
+    report = pd.concat(residuals, ignore_index=True)
+    cube = combine_cubes([cube] + adjustments)
+    # Activity eliminated in full within its month leaves the cube, as if never posted
+    accounts = {name for rule in rules for name in rule["accounts"]}
+    emptied = cube["Account Name"].isin(accounts) & (cube["Debit"].round(2) == 0) & (cube["Credit"].round(2) == 0)
+    return cube[~emptied.to_numpy()].reset_index(drop=True), report
+
+
+@timed("load: consolidation")
+def consolidate(source=ENTITIES_DIR, workers=None, progress=None):
+    """Per-entity and consolidated cubes and balance indexes for every workbook in `source` (a
+    directory or a glob pattern).
+
+    Returns {"cubes": {entity: cube}, "balances": {entity: index}, "eliminations": report}, where
+    the consolidated figures are under CONSOLIDATED. Cached until a workbook or the rules change.
+    """
+    workbooks = entity_workbooks(source)
+    directory = rules_directory(source)
+    rules_path = os.path.join(directory, ELIMINATIONS_FILE)
+    key = (tuple(file_signature(p) for p in workbooks.values()),
+           file_signature(rules_path) if os.path.exists(rules_path) else None)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+
+    cubes = load_entity_cubes(workbooks, workers, progress)
+    if cubes:
+        consolidated, report = eliminate(combine_cubes(list(cubes.values())), read_elimination_rules(directory))
+        cubes[CONSOLIDATED] = consolidated
+    else:
+        report = pd.DataFrame(columns=["Rule", "Month", "Difference"])
+    result = {
+        "cubes": cubes,
+        "balances": {name: build_balance_index(cube) for name, cube in cubes.items()},
+        "eliminations": report,
+    }
+    with _cache_lock:
+        _cache.clear()
+        _cache[key] = result
+    return result
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import DATA_FILE, get_derived, get_monthly_cube
+from utils.profiling import timed
+
+WINDOW_MONTHS = 15
+# Metric -> accounts whose Net (Debit - Credit) it sums
+METRICS = {
+    "Cash": ["Cash", "Cash at Bank"],
+    "Revenue": ["Service Revenue"],
+    "Expenses": ["Salaries Expense"],
+    "Net Assets": ["Cash", "Accounts Receivable", "Investments", "Accounts Payable"],
+    "Investments": ["Investments"]
+}
+
+
+# ---------------- ROLLING WINDOW ----------------
+def window_pivot(cube, months=WINDOW_MONTHS, value="Net"):
+    """Month x account pivot of `value` over the last `months` months with activity, in date order."""
+    window = np.sort(cube["Month"].unique())[-months:]
+    in_window = cube[cube["Month"].isin(window)]
+    pivot = in_window.pivot_table(index="Month", columns="Account Name", values=value,
+                                  aggfunc="sum", fill_value=0, observed=True)
+    return pivot.reindex(pd.PeriodIndex(window, freq="M"), fill_value=0)
+
+
+@timed("aggregate: dashboard series")
+def metric_series(pivot, metrics=METRICS):
+    """One column per metric, each the sum of its accounts' columns, from a single matrix product."""
+    accounts = pivot.columns.astype(str)
+    weights = np.array([[account in set(members) for members in metrics.values()] for account in accounts],
+                       dtype="float64").reshape(len(accounts), len(metrics))
+    series = pd.DataFrame(pivot.to_numpy(dtype="float64") @ weights, index=pivot.index, columns=list(metrics))
+    series.index.name = "Month"
+    return series
+
+
+def month_labels(index):
+    return [month.strftime("%b-%y") for month in index]
+
+
+def dashboard_series(path=DATA_FILE, months=WINDOW_MONTHS, metrics=METRICS):
+    """Cached metric_series of the workbook's monthly cube for this window and these metrics."""
+    key = ("dashboard_series", months, tuple((m, tuple(a)) for m, a in metrics.items()))
+    return get_derived(path, key, lambda: metric_series(window_pivot(get_monthly_cube(path), months), metrics))
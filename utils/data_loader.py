@@ -0,0 +1,324 @@
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils.aggregates import build_monthly_cube
+from utils.balances import build_balance_index
+from utils.drilldown import build_line_index
+from utils.profiling import timed
+from utils.streaming_ingest import stream_monthly_cube
+from utils.validation import combine_stats, ledger_stats, report_from_stats, validate_ledger
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # sidecar is optional, fall back to parsing the workbook
+    pa = feather = None
+
+DATA_FILE = "trial_balance_cashflow.xlsx"
+SIDECAR_DIR = ".tb_cache"
+AMOUNT_COLUMNS = ["Debit", "Credit"]
+# What the app reads from a workbook; other columns (memos, references) are not kept in the sidecar
+LEDGER_COLUMNS = ["Date", "Account Name", "Account Type"] + AMOUNT_COLUMNS
+# Workbooks at least this large are aggregated by streaming instead of loaded whole
+STREAMING_MIN_BYTES = int(os.environ.get("TB_STREAMING_MIN_BYTES", 64 * 1024 * 1024))
+
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+_cache = {}
+# Guards _cache and the entries' lock tables only; builders run under a lock of their own
+_cache_lock = threading.Lock()
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def normalize_dtypes(df):
+    df = df.copy()
+    # Unparseable dates become NaT and are reported by utils.validation
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["Account Name"] = df["Account Name"].astype("category")
+    df["Account Type"] = df["Account Type"].astype("category")
+    for col in AMOUNT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
+    return df
+
+
+# ---------------- COLUMNAR SIDECAR ----------------
+def cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), SIDECAR_DIR)
+
+
+def sidecar_path(path):
+    return os.path.join(cache_dir(path), os.path.basename(path) + ".feather")
+
+
+def _source_tag(path):
+    _, mtime_ns, size = file_signature(path)
+    return json.dumps({"mtime_ns": mtime_ns, "size": size}).encode()
+
+
+def read_sidecar(path):
+    """Memory-map the sidecar of `path`; None when missing or stale."""
+    target = sidecar_path(path)
+    if feather is None or not os.path.exists(target):
+        return None
+    try:
+        table = feather.read_table(target, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if (table.schema.metadata or {}).get(b"tb_source") != _source_tag(path):
+        return None
+    df = table.to_pandas()
+    # Amounts are stored as fixed-point paise
+    for col in AMOUNT_COLUMNS:
+        df[col] = df[col] / 100
+    return df
+
+
+def write_sidecar(path, df):
+    if feather is None:
+        return
+    target = sidecar_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    disk = df[LEDGER_COLUMNS].copy()
+    for col in AMOUNT_COLUMNS:
+        disk[col] = (disk[col] * 100).round().astype("int64")
+    table = pa.Table.from_pandas(disk, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"tb_source": _source_tag(path)})
+    # A temp file of its own, as several processes may load the same workbook at once
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=os.path.basename(target) + ".")
+    os.close(fd)
+    try:
+        # Uncompressed so that later reads can be memory-mapped
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_source(path):
+    # The workbook itself, or a CSV export of it
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, parse_dates=["Date"])
+    return pd.read_excel(path, parse_dates=["Date"])
+
+
+@timed("load: trial balance")
+def load_trial_balance(path=DATA_FILE, use_sidecar=True):
+    if use_sidecar:
+        df = read_sidecar(path)
+        if df is not None:
+            return df
+    df = normalize_dtypes(read_source(path))
+    if use_sidecar:
+        try:
+            write_sidecar(path, df)
+        except (OSError, pa.ArrowException):  # read-only checkout or unstorable data, serve the workbook
+            pass
+    return df
+
+
+def copy_on_write():
+    # Always on from pandas 3.0; on 2.x only if the application opted in
+    return _PANDAS_MAJOR >= 3 or (_PANDAS_MAJOR == 2 and pd.get_option("mode.copy_on_write") is True)
+
+
+def read_only_view(df):
+    """A copy of a cached frame that callers cannot write through: shallow under Copy-on-Write,
+    a full copy otherwise."""
+    return df.copy(deep=not copy_on_write())
+
+
+# ---------------- PROCESS-WIDE CACHE ----------------
+def _entry(path):
+    # Caller holds _cache_lock. One entry per file: its signature, everything built from it and a
+    # build lock per value.
+    signature = file_signature(path)
+    entry = _cache.get(signature[0])
+    if entry is None or entry["signature"] != signature:
+        entry = {"signature": signature, "values": {}, "locks": {}}
+        _cache[signature[0]] = entry
+    return entry
+
+
+def get_derived(path, name, builder):
+    """builder() computed once per version of the file at `path` and cached until it changes.
+
+    Only callers wanting the same value wait for its build; others (and cache hits) go ahead.
+    Builders may call get_derived for other values of the same path.
+    """
+    with _cache_lock:
+        entry = _entry(path)
+        if name in entry["values"]:
+            return entry["values"][name]
+        lock = entry["locks"].setdefault(name, threading.Lock())
+    with lock:
+        with _cache_lock:
+            if name in entry["values"]:
+                return entry["values"][name]
+        value = builder()
+        with _cache_lock:
+            # If the file changed meanwhile, `entry` is no longer in _cache and this is dropped with it
+            return entry["values"].setdefault(name, value)
+
+
+def store_derived(path, name, value, signature):
+    """Put a value built elsewhere (e.g. in a worker process) into the cache of `path`.
+
+    Ignored when the file has changed since `signature` was taken. Returns the cached value.
+    """
+    with _cache_lock:
+        entry = _entry(path)
+        if entry["signature"] != signature:
+            return value
+        return entry["values"].setdefault(name, value)
+
+
+def get_trial_balance(path=DATA_FILE):
+    """Cached load_trial_balance, re-read only when the workbook changes on disk."""
+    return read_only_view(get_derived(path, "ledger", lambda: load_trial_balance(path)))
+
+
+def is_streamed(path):
+    # Workbooks this large are aggregated chunk by chunk and never held in memory whole
+    return os.path.getsize(path) >= STREAMING_MIN_BYTES
+
+
+def get_line_index(path=DATA_FILE):
+    """utils.drilldown index of the cached ledger: lines sorted by account and date, with row ranges.
+
+    None for streamed workbooks, where it would mean holding (a sorted copy of) the whole ledger.
+    """
+    if is_streamed(path):
+        return None
+    return get_derived(path, "line_index", lambda: build_line_index(get_trial_balance(path)))
+
+
+def _stream_workbook(path):
+    # One pass over a large workbook feeds both the cube and the validation statistics. Statistics
+    # are folded as chunks arrive and leave out the per-line duplicate hashes, so memory stays at
+    # one chunk plus the cube
+    stats = [combine_stats([])]
+
+    def add_chunk(chunk):
+        stats[0] = combine_stats([stats[0], ledger_stats(chunk, duplicates=False)])
+
+    cube = stream_monthly_cube(path, on_chunk=add_chunk)
+    return cube, report_from_stats(stats[0])
+
+
+@timed("aggregate: monthly cube")
+def _build_monthly_cube(path):
+    # Large ledgers are folded chunk by chunk so the full journal is never held in memory
+    if is_streamed(path):
+        return get_derived(path, "streamed", lambda: _stream_workbook(path))[0]
+    return build_monthly_cube(get_trial_balance(path))
+
+
+def get_monthly_cube(path=DATA_FILE):
+    return read_only_view(get_derived(path, "monthly_cube", lambda: _build_monthly_cube(path)))
+
+
+def get_balance_index(path=DATA_FILE):
+    return get_derived(path, "balance_index", lambda: build_balance_index(get_monthly_cube(path)))
+
+
+@timed("load: validation")
+def _build_validation_report(path):
+    if is_streamed(path):
+        return get_derived(path, "streamed", lambda: _stream_workbook(path))[1]
+    return validate_ledger(get_trial_balance(path))
+
+
+def get_validation_report(path=DATA_FILE):
+    """utils.validation report for the workbook, computed once per version of the file."""
+    return get_derived(path, "validation", lambda: _build_validation_report(path))
+
+
+# ---------------- MULTI-WORKBOOK LOAD ----------------
+def expand_workbooks(sources):
+    """Workbook paths for a path, a glob pattern or a list of either, in order and without repeats."""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    paths = []
+    for source in map(str, sources):
+        matches = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        paths += [p for p in matches if not os.path.basename(p).startswith("~$") and p not in paths]
+    return paths
+
+
+def _load_cube(path):
+    # Runs in a worker process: parse (or memory-map) the workbook, aggregate it and send back only
+    # the small monthly cube, tagged with the file version it was built from. The worker's own
+    # cache would be discarded with it, so it is bypassed.
+    signature = file_signature(path)
+    if is_streamed(path):
+        return signature, stream_monthly_cube(path)
+    return signature, build_monthly_cube(load_trial_balance(path))
+
+
+@contextmanager
+def _main_script_hidden():
+    # A spawned worker re-runs the parent's __main__ script before taking its first task. Under
+    # Streamlit that is the page being rendered (which cannot have a __main__ guard), so workers are
+    # started with an empty __main__; they only need this module.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def iter_monthly_cubes(sources, workers=None):
+    """(path, cube) for every workbook in `sources`, each yielded as soon as it is ready.
+
+    Workbooks are parsed concurrently in a process pool (openpyxl parsing is CPU-bound), spawned
+    rather than forked so no child starts with a copy of a lock another thread held; every cube
+    goes into this process's cache as it arrives, so get_monthly_cube(path) is then a hit. Files
+    already cached here are yielded first, without a worker.
+    """
+    pending = []
+    for path in expand_workbooks(sources):
+        with _cache_lock:
+            cached = "monthly_cube" in _entry(path)["values"]
+        if cached:
+            yield path, get_monthly_cube(path)
+        else:
+            pending.append(path)
+    if len(pending) == 1:
+        yield pending[0], get_monthly_cube(pending[0])
+    elif pending:
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Workers are started on submit
+            with _main_script_hidden():
+                futures = {pool.submit(_load_cube, path): path for path in pending}
+            for future in as_completed(futures):
+                path = futures[future]
+                signature, cube = future.result()
+                yield path, read_only_view(store_derived(path, "monthly_cube", cube, signature))
+
+
+def load_monthly_cubes(sources, workers=None, progress=None):
+    """{path: monthly cube} for `sources` in their given order; progress(done, total, path) after each file."""
+    paths = expand_workbooks(sources)
+    cubes = {}
+    for path, cube in iter_monthly_cubes(paths, workers):
+        cubes[path] = cube
+        if progress is not None:
+            progress(len(cubes), len(paths), path)
+    return {path: cubes[path] for path in paths}
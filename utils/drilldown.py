@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import period_months
+from utils.compact_ledger import month_ordinals, to_paise
+from utils.profiling import timed
+
+# Journal lines behind a statement figure. At load the ledger is sorted by account and date once,
+# and every (account, month) is mapped to its [start, stop) row range in that order; an account's
+# lines for any run of months are then one contiguous slice, found by binary search.
+PAGE_SIZE = 50
+LINE_COLUMNS = ["Row", "Date", "Account Name", "Account Type", "Debit", "Credit"]
+# The workbook's header is row 1, so ledger position 0 is row 2
+FIRST_DATA_ROW = 2
+# Month ordinals are offset into the low 32 bits of a key; missing dates take this month and sort first
+UNDATED = -2 ** 31
+
+
+def _keys(account_codes, months):
+    # (account, month) as one sortable int64; missing names (code -1) sort first
+    return (np.asarray(account_codes, dtype="int64") + 1) * 2 ** 32 + (np.asarray(months, dtype="int64") - UNDATED)
+
+
+@timed("aggregate: line index")
+def build_line_index(df):
+    """The ledger sorted by account and date plus the (account, month) -> row range index.
+
+    Returns {"lines": sorted ledger with its workbook Row, "accounts": account names in code order,
+    "keys": sorted (account, month) keys, "starts"/"stops": their row ranges, "debit"/"credit":
+    running paise totals over the sorted lines (for O(1) slice totals)}.
+    """
+    names = pd.Categorical(df["Account Name"])
+    months, dated = month_ordinals(df["Date"])
+    months = np.where(dated, months, UNDATED)
+    order = np.lexsort((np.asarray(df["Date"], dtype="datetime64[ns]"), months, names.codes))
+    codes = names.codes.take(order)
+    keys = _keys(codes, months.take(order))
+
+    lines = df.iloc[order].reset_index(drop=True)
+    lines.insert(0, "Row", order + FIRST_DATA_ROW)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype="int64")
+    return {
+        "lines": lines[LINE_COLUMNS],
+        "accounts": names.categories,
+        "keys": keys[starts],
+        "starts": starts,
+        "stops": np.r_[starts[1:], len(keys)].astype("int64"),
+        "debit": np.r_[0, np.cumsum(to_paise(lines["Debit"]))],
+        "credit": np.r_[0, np.cumsum(to_paise(lines["Credit"]))],
+    }
+
+
+def line_range(index, account, period):
+    """[start, stop) of `account`'s lines posted in `period` within index["lines"]."""
+    code = index["accounts"].get_indexer([account])[0]
+    if code < 0:
+        return 0, 0
+    first, last = period_months(period)
+    lo = np.searchsorted(index["keys"], _keys(code, first), side="left")
+    hi = np.searchsorted(index["keys"], _keys(code, last), side="right")
+    if lo == hi:
+        return 0, 0
+    return int(index["starts"][lo]), int(index["stops"][hi - 1])
+
+
+def drilldown(index, account, period, page=1, page_size=PAGE_SIZE):
+    """One page of `account`'s lines in `period` plus {"count", "pages", "debit", "credit"} for all of them."""
+    start, stop = line_range(index, account, period)
+    count = stop - start
+    pages = max(-(-count // page_size), 1)
+    page = min(max(int(page), 1), pages)
+    first = start + (page - 1) * page_size
+    rows = index["lines"].iloc[first:min(first + page_size, stop)]
+    summary = {
+        "count": count,
+        "pages": pages,
+        "debit": (index["debit"][stop] - index["debit"][start]) / 100,
+        "credit": (index["credit"][stop] - index["credit"][start]) / 100,
+    }
+    return rows, summary
+
+
+def accounts_with_lines(index):
+    """Account names that have at least one line, in name order."""
+    codes = np.unique(index["keys"] // 2 ** 32 - 1)
+    return sorted(str(index["accounts"][c]) for c in codes if c >= 0)
@@ -0,0 +1,176 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.aggregates import period_label
+from utils.data_loader import DATA_FILE
+from utils.html_render import STYLESHEET, table_markup
+from utils.profiling import timed
+from utils.statement_memo import get_statements
+from utils.statement_table import PCT_COLUMN, bold_rows, display_table
+
+# Month-end packs: the three statements for a range of periods, each compared with the period
+# before it as on the Financials / Yearly pages, in one XLSX (a sheet per period), one static HTML
+# file and one PDF (a page per statement). Writers take a binary file object, so the same pack
+# can go to disk or to a download button. The XLSX holds numbers with number formats; HTML and PDF
+# show the tables as the pages do.
+PACK_FORMATS = ["xlsx", "html", "pdf"]
+PACK_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "html": "text/html",
+    "pdf": "application/pdf",
+}
+PDF_PAGE = (8.27, 11.69)  # A4 portrait, inches
+PDF_ROWS = 60
+PDF_FONT_SIZE = 8
+PDF_LINE_SPACING = 1.6
+PDF_LINE = PDF_FONT_SIZE * PDF_LINE_SPACING / 72 / PDF_PAGE[1]  # one text line, in figure height
+PDF_MARGIN = 0.06
+PDF_FIRST_COLUMN = 0.28
+PDF_TOP = 0.92
+# Amounts in whole rupees with the sign after the symbol, as the pages show them; % changes are
+# written as fractions
+XLSX_INR_FORMAT = '"₹"#,##0;"₹"-#,##0'
+XLSX_PCT_FORMAT = "0.0%"
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def plain_text(table):
+    # Labels carry <b> markup for the HTML views
+    return table.assign(**{table.columns[0]: table.iloc[:, 0].astype(str).str.replace(_TAG, "", regex=True)})
+
+
+# ---------------- PERIODS ----------------
+def pack_pairs(periods, first, last):
+    """(current, previous) for every period from `first` to `last` that has a period before it."""
+    return [(current, previous) for previous, current in zip(periods, periods[1:]) if first <= current <= last]
+
+
+@timed("statement: export pack")
+def pack_statements(pairs, annual=False, path=DATA_FILE, workers=4):
+    """[(label, statements)] in period order, the periods built concurrently through the statement memo."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        tables = pool.map(lambda pair: get_statements(pair[0], pair[1], annual=annual, path=path), pairs)
+        return [(period_label(current), statements) for (current, _), statements in zip(pairs, tables)]
+
+
+# ---------------- WRITERS ----------------
+def append_statement(sheet, table, title=None):
+    """Append a statement to a write-only sheet: numeric cells with INR / percent formats, bold
+    header, section headers and totals, blanks left empty."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    bold = Font(bold=True)
+
+    def cell(value, is_bold, number_format=None):
+        c = WriteOnlyCell(sheet, value=value)
+        if is_bold:
+            c.font = bold
+        if number_format:
+            c.number_format = number_format
+        return c
+
+    if title is not None:
+        sheet.append([cell(title, True)])
+    sheet.append([cell(str(column), True) for column in table.columns])
+    labels = plain_text(table).iloc[:, 0].tolist()
+    values = table.iloc[:, 1:].to_numpy(dtype="float64")
+    pct = [column == PCT_COLUMN for column in table.columns[1:]]
+    for label, row, is_bold in zip(labels, values, bold_rows(table)):
+        cells = [cell(label, is_bold)]
+        for value, is_pct in zip(row.tolist(), pct):
+            if value != value:  # blank
+                cells.append(cell(None, False))
+            elif is_pct:
+                cells.append(cell(value / 100, is_bold, XLSX_PCT_FORMAT))
+            else:
+                cells.append(cell(value, is_bold, XLSX_INR_FORMAT))
+        sheet.append(cells)
+
+
+def write_xlsx(pack, f):
+    """One sheet per period with the statements stacked; write-only, so rows go straight to disk."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for label, statements in pack:
+        sheet = workbook.create_sheet(title=label[:31])
+        for title, table in statements.items():
+            append_statement(sheet, table, title)
+            sheet.append([])
+    workbook.save(f)
+
+
+def write_html(pack, f):
+    """A single static page: contents, then every period's statements in the app's table style."""
+    def out(text):
+        f.write(text.encode("utf-8"))
+
+    out(f"<html><head><meta charset='utf-8'><title>Financial statements</title>{STYLESHEET}</head><body>")
+    out("<h1>Financial statements</h1><ul>")
+    out("".join(f"<li><a href='#p{i}'>{label}</a></li>" for i, (label, _) in enumerate(pack)))
+    out("</ul>")
+    for i, (label, statements) in enumerate(pack):
+        out(f"<h2 id='p{i}'>{label}</h2>")
+        for title, table in statements.items():
+            out(f"<h3>{title}</h3>{table_markup(display_table(table))}")
+    out("</body></html>")
+
+
+def _pdf_page(fig, heading, table):
+    # One Text per column and weight (not one per cell): rows line up because every column has the
+    # same number of lines, and drawing stays fast for long packs
+    from matplotlib.lines import Line2D
+
+    table = display_table(table)
+    text = table.replace(_TAG, "", regex=True).astype(str)
+    bold = table.astype(str).apply(lambda column: column.str.startswith("<b>"))
+    width = len(table.columns)
+    right_edges = [PDF_FIRST_COLUMN + (1 - PDF_FIRST_COLUMN - PDF_MARGIN) * (i + 1) / max(width - 1, 1)
+                   for i in range(width - 1)]
+    fig.text(0.5, 0.96, heading, ha="center", va="top", fontsize=12, fontweight="bold")
+    for i, column in enumerate(table.columns):
+        x, ha = (PDF_MARGIN, "left") if i == 0 else (right_edges[i - 1], "right")
+        fig.text(x, PDF_TOP, str(column), ha=ha, va="top", fontsize=PDF_FONT_SIZE, fontweight="bold")
+        for weight, mask in (("normal", ~bold.iloc[:, i]), ("bold", bold.iloc[:, i])):
+            lines = "\n".join(text.iloc[:, i].where(mask, ""))
+            fig.text(x, PDF_TOP - PDF_LINE, lines, ha=ha, va="top", fontsize=PDF_FONT_SIZE, fontweight=weight,
+                     linespacing=PDF_LINE_SPACING)
+    fig.add_artist(Line2D([PDF_MARGIN, 1 - PDF_MARGIN], [PDF_TOP - PDF_LINE * 0.8] * 2, color="#003366",
+                          linewidth=0.8))
+
+
+def write_pdf(pack, f):
+    """A page per statement and period (long statements continue on the next page); pages are
+    flushed to `f` as they are drawn."""
+    from matplotlib.backends.backend_pdf import FigureCanvasPdf, PdfPages
+    from matplotlib.figure import Figure
+
+    with PdfPages(f) as pdf:
+        for label, statements in pack:
+            for title, table in statements.items():
+                for start in range(0, max(len(table), 1), PDF_ROWS):
+                    fig = Figure(figsize=PDF_PAGE)
+                    try:
+                        FigureCanvasPdf(fig)
+                        _pdf_page(fig, f"{title} — {label}", table.iloc[start:start + PDF_ROWS])
+                        pdf.savefig(fig)
+                    finally:
+                        fig.clear()
+
+
+WRITERS = {"xlsx": write_xlsx, "html": write_html, "pdf": write_pdf}
+
+
+@timed("render: export pack")
+def export_pack(pack, formats=PACK_FORMATS, workers=3):
+    """{format: bytes} for the pack, the formats written concurrently."""
+    def render(fmt):
+        buffer = io.BytesIO()
+        WRITERS[fmt](pack, buffer)
+        return buffer.getvalue()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(formats, pool.map(render, formats)))
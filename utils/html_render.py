@@ -0,0 +1,88 @@
+import hashlib
+
+import pandas as pd
+
+from utils.lru import LRUCache
+from utils.profiling import timed
+from utils.statement_table import display_table
+
+# The statement stylesheet, built once for every table on every page
+TABLE_CSS = """
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        font-family: sans-serif;
+    }
+    th {
+        background-color: #003366;
+        color: white;
+        padding: 8px;
+        text-align: center;
+    }
+    td {
+        padding: 8px;
+    }
+    td:first-child {
+        text-align: left;
+    }
+    td:not(:first-child) {
+        text-align: center;
+    }
+    tbody tr:nth-child(even) {background-color: #f0f8ff;}
+    tbody tr:nth-child(odd) {background-color: white;}
+"""
+STYLESHEET = f"<style>{TABLE_CSS}</style>"
+
+# Frame sizing: header and body rows are one line of text plus 8px padding and a border
+ROW_HEIGHT = 37
+FRAME_PADDING = 24
+MAX_FRAME_HEIGHT = 1500
+HTML_CACHE_SIZE = 128
+
+_html = LRUCache(HTML_CACHE_SIZE)
+
+
+# ---------------- MARKUP ----------------
+def table_markup(df):
+    """The table of DataFrame.to_html(escape=False, index=False), joined column-wise in one pass."""
+    head = "".join(f"<th>{col}</th>" for col in df.columns)
+    if len(df.columns):
+        cells = ["<tr><td>" + df.iloc[:, 0].astype(str)]
+        cells += ["</td><td>" + df.iloc[:, i].astype(str) for i in range(1, len(df.columns))]
+        rows = "".join(sum(cells[1:], cells[0]) + "</td></tr>")
+    else:
+        rows = ""
+    return (f'<table border="1" class="dataframe"><thead><tr>{head}</tr></thead>'
+            f"<tbody>{rows}</tbody></table>")
+
+
+def content_key(df):
+    digest = hashlib.sha1(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def styled_table(df):
+    """Stylesheet plus markup of a statement table as displayed, memoized by a hash of the table's
+    content (LRU)."""
+    return _html.get(content_key(df), lambda: STYLESHEET + table_markup(display_table(df)))
+
+
+def frame_height(df, max_height=MAX_FRAME_HEIGHT):
+    return min(FRAME_PADDING + ROW_HEIGHT * (len(df) + 1), max_height)
+
+
+# ---------------- STREAMLIT ----------------
+@timed("render: table")
+def render_table(df, max_height=MAX_FRAME_HEIGHT):
+    """The table in an iframe sized to its rows; scrolls only beyond `max_height`."""
+    from streamlit.components.v1 import html
+
+    html(styled_table(df), height=frame_height(df, max_height), scrolling=True)
+
+
+def render_statement(title, df):
+    import streamlit as st
+
+    st.markdown(f"<h4 style='text-align:center'>{title}</h4>", unsafe_allow_html=True)
+    render_table(df)
@@ -0,0 +1,45 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.compact_ledger import to_paise
+
+# Recognising a ledger that was only appended to since it was last ingested: the row count, the
+# latest date and a digest of every previously ingested line, so that editing, removing or
+# reordering any earlier line forces a rebuild. The digest runs on numbers only (dates in ns,
+# amounts in paise, names as one hash per distinct value), never on per-line strings.
+
+
+def _value_hashes(values):
+    # One hash per distinct name, spread over the lines by categorical code; missing names hash to 0
+    values = pd.Categorical(values)
+    distinct = pd.util.hash_array(values.categories.astype(str).to_numpy(dtype=object))
+    return np.r_[distinct, np.uint64(0)].take(values.codes)
+
+
+def fingerprint(ledger, rows):
+    """Digest of ledger[:rows], independent of how the ledger was read (workbook, sidecar, CSV)."""
+    head = ledger.iloc[:rows]
+    digest = hashlib.sha1()
+    for column in (
+        np.asarray(head["Date"], dtype="datetime64[ns]").view("int64"),
+        _value_hashes(head["Account Name"]),
+        _value_hashes(head["Account Type"]),
+        to_paise(head["Debit"]),
+        to_paise(head["Credit"]),
+    ):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
+
+
+def is_append(state, ledger):
+    """True when `ledger` is the previously ingested rows, unchanged, followed only by newer lines.
+
+    `state` holds the "rows", "checksum" (fingerprint) and "high_water_date" of the last ingest.
+    """
+    rows = state["rows"]
+    if len(ledger) < rows or fingerprint(ledger, rows) != state["checksum"]:
+        return False
+    appended = ledger["Date"].iloc[rows:]
+    return appended.empty or appended.min() >= pd.Timestamp(state["high_water_date"])
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import ACCOUNT_KEYS, CUBE_VALUES, category_map, period_months
+from utils.balances import as_of_month
+from utils.cashflow_logic import cash_flow_tables
+from utils.compact_ledger import compact_ledger, month_ordinals
+from utils.data_loader import cache_dir, get_trial_balance
+from utils.incremental import fingerprint, is_append
+from utils.statements import STATEMENT_NAMES, balance_sheet_table, income_statement_table
+
+# Optional embedded store: the ledger in SQLite next to the sidecar, indexed by (account, date),
+# with a (account, month) rollup kept up to date on import. Statement queries are pushed down as
+# SQL aggregates over the rollup, so only per-account totals reach pandas.
+# Dates are stored as days since 1970-01-01, months as Period[M] ordinals, amounts as paise.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    type TEXT
+);
+CREATE TABLE IF NOT EXISTS lines (
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    date INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    debit INTEGER NOT NULL,
+    credit INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_account_date ON lines(account_id, date);
+CREATE TABLE IF NOT EXISTS monthly (
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    month INTEGER NOT NULL,
+    debit INTEGER NOT NULL,
+    credit INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    PRIMARY KEY (account_id, month)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Period queries read the monthly rollup, maintained at import, never the journal lines
+TOTALS_SQL = """
+SELECT a.type, a.name, SUM(m.debit), SUM(m.credit), SUM(m.lines)
+FROM monthly m JOIN accounts a ON a.id = m.account_id
+WHERE m.month BETWEEN ? AND ?
+GROUP BY m.account_id
+"""
+
+# Closing balance of one account: every month up to and including the close, one SUM over the rollup
+BALANCE_SQL = """
+SELECT COALESCE(SUM(m.debit - m.credit), 0)
+FROM monthly m JOIN accounts a ON a.id = m.account_id
+WHERE a.name = ? AND m.month <= ?
+"""
+
+ROLLUP_SQL = """
+INSERT INTO monthly (account_id, month, debit, credit, lines)
+SELECT account_id, month, SUM(debit), SUM(credit), COUNT(*) FROM lines WHERE rowid > ?
+GROUP BY account_id, month
+ON CONFLICT (account_id, month) DO UPDATE SET
+    debit = debit + excluded.debit, credit = credit + excluded.credit, lines = lines + excluded.lines
+"""
+
+
+# ---------------- STORE ----------------
+def store_path(path):
+    return os.path.join(cache_dir(path), os.path.basename(path) + ".sqlite")
+
+
+def open_store(path):
+    """Connection to the store for workbook `path`, creating the schema on first use."""
+    db = store_path(path)
+    os.makedirs(os.path.dirname(db), exist_ok=True)
+    con = sqlite3.connect(db)
+    con.executescript(SCHEMA)
+    return con
+
+
+def read_meta(con):
+    return dict(con.execute("SELECT key, value FROM meta").fetchall())
+
+
+def _account_ids(con, accounts):
+    # Store ids for the ledger's (type, name) pairs, adding any the store has not seen
+    known = {(t, n): i for i, n, t in con.execute("SELECT id, name, type FROM accounts")}
+    pairs = [(None if pd.isna(t) else str(t), None if pd.isna(n) else str(n))
+             for t, n in zip(accounts["Account Type"].astype(object), accounts["Account Name"].astype(object))]
+    for pair in pairs:
+        if pair not in known:
+            known[pair] = con.execute("INSERT INTO accounts (type, name) VALUES (?, ?)", pair).lastrowid
+    return np.array([known[pair] for pair in pairs], dtype="int64")
+
+
+def import_ledger(con, ledger):
+    """Bring the store up to date with `ledger`; only appended lines are inserted when possible.
+
+    Lines are only appended when every previously imported line is unchanged (utils.incremental);
+    otherwise the store is rebuilt. Returns "append", "rebuild" or "unchanged".
+    """
+    meta = read_meta(con)
+    state = {"rows": int(meta["rows"]), "checksum": meta["checksum"],
+             "high_water_date": meta["high_water_date"]} if "rows" in meta else None
+    if state is not None and is_append(state, ledger):
+        delta = ledger.iloc[state["rows"]:]
+        mode = "append" if len(delta) else "unchanged"
+    else:
+        delta, mode = ledger, "rebuild"
+
+    with con:
+        if mode == "rebuild":
+            for table in ("monthly", "lines", "accounts"):
+                con.execute(f"DELETE FROM {table}")
+        last_rowid = con.execute("SELECT COALESCE(MAX(rowid), 0) FROM lines").fetchone()[0]
+        if len(delta):
+            facts, accounts = compact_ledger(delta)
+            # Undated lines belong to no month; the cube leaves them out, and so does the store
+            facts = facts[facts["Date"].notna()]
+            ids = _account_ids(con, accounts).take(facts["Account ID"].to_numpy())
+            days = facts["Date"].to_numpy().astype("datetime64[D]").astype("int64")
+            rows = zip(ids.tolist(), days.tolist(), month_ordinals(facts["Date"])[0].tolist(),
+                       facts["Debit Paise"].tolist(), facts["Credit Paise"].tolist())
+            con.executemany("INSERT INTO lines VALUES (?, ?, ?, ?, ?)", rows)
+            con.execute(ROLLUP_SQL, (last_rowid,))
+        high_water = ledger["Date"].max().isoformat() if len(ledger) else "1900-01-01"
+        con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                        [("rows", str(len(ledger))), ("checksum", fingerprint(ledger, len(ledger))),
+                         ("high_water_date", high_water), ("mode", mode)])
+    if mode == "rebuild":
+        con.execute("ANALYZE")
+    return mode
+
+
+def sync_store(path):
+    """open_store plus import of the (cached) workbook; returns the connection and the import mode."""
+    con = open_store(path)
+    return con, import_ledger(con, get_trial_balance(path))
+
+
+# ---------------- PUSHDOWN QUERIES ----------------
+def _account_frame(rows, columns):
+    frame = pd.DataFrame(rows, columns=["Account Type", "Account Name"] + columns)
+    frame.insert(0, "Account Category", frame["Account Type"].map(category_map))
+    return frame
+
+
+def store_period_totals(con, period):
+    """period_totals from the store: per-account Debit, Credit, Net and Lines for one period."""
+    totals = _account_frame(con.execute(TOTALS_SQL, period_months(period)).fetchall(),
+                            ["Debit", "Credit", "Lines"])
+    totals[["Debit", "Credit"]] = totals[["Debit", "Credit"]].astype("float64") / 100
+    totals["Net"] = totals["Debit"] - totals["Credit"]
+    return totals[ACCOUNT_KEYS + CUBE_VALUES]
+
+
+def store_balances_as_of(con, period):
+    """balances_as_of from the store: cumulative Net and Lines per account at the close of `period`."""
+    rows = con.execute(TOTALS_SQL, (np.iinfo("int64").min, as_of_month(period).ordinal)).fetchall()
+    balances = _account_frame(rows, ["Debit", "Credit", "Lines"])
+    balances["Net"] = (balances["Debit"] - balances["Credit"]).astype("float64") / 100
+    return balances[["Account Name", "Account Category", "Account Type", "Net", "Lines"]]
+
+
+def store_totals_by_period(con, periods):
+    """totals_by_period from the store: (value, period) columns per account, zeros where inactive.
+
+    One query over the rollup with a conditional SUM per value and period.
+    """
+    bounds = [period_months(period) for period in periods]
+    sums = ", ".join(f"SUM(CASE WHEN m.month BETWEEN ? AND ? THEN m.{column} ELSE 0 END)"
+                     for column in ("debit", "credit", "lines") for _ in bounds)
+    where = " OR ".join("m.month BETWEEN ? AND ?" for _ in bounds)
+    query = (f"SELECT a.type, a.name, {sums} FROM monthly m JOIN accounts a ON a.id = m.account_id "
+             f"WHERE {where} GROUP BY m.account_id")
+    params = [b for _ in range(3) for pair in bounds for b in pair] + [b for pair in bounds for b in pair]
+    rows = con.execute(query, params).fetchall()
+
+    values = np.array([row[2:] for row in rows], dtype="int64").reshape(len(rows), 3, len(periods))
+    debit, credit = values[:, 0] / 100, values[:, 1] / 100
+    types = [row[0] for row in rows]
+    index = pd.MultiIndex.from_arrays([pd.Series(types, dtype=object).map(category_map), types,
+                                       [row[1] for row in rows]], names=ACCOUNT_KEYS)
+    wide = pd.DataFrame(np.hstack([debit, credit, debit - credit, values[:, 2]]), index=index,
+                        columns=pd.MultiIndex.from_product([CUBE_VALUES, list(periods)]))
+    wide["Lines"] = wide["Lines"].astype("int64")
+    return wide.sort_index()
+
+
+def store_account_balance(con, account_name, period):
+    """account_balance from the store: cumulative Net of `account_name` at the close of `period`."""
+    return con.execute(BALANCE_SQL, (account_name, as_of_month(period).ordinal)).fetchone()[0] / 100
+
+
+def store_statements(con, current, previous, annual=False):
+    """statements() answered from the store.
+
+    Every figure is a SQL aggregate over the monthly rollup: closing balances for the balance
+    sheet, the two periods' per-account totals for the income statement and cash flow, and one
+    SUM per Cash at Bank balance.
+    """
+    balance_df = balance_sheet_table(store_balances_as_of(con, current), store_balances_as_of(con, previous),
+                                     current, previous)
+    wide = store_totals_by_period(con, [current, previous])
+    cash = [store_account_balance(con, "Cash at Bank", period)
+            for period in (current - 1, previous - 1, current, previous)]
+    annual_income_df, cash_flow_df = cash_flow_tables(wide, current, previous, cash)
+    if annual:
+        # The yearly view shows the income statement built alongside the cash flow
+        income_df = annual_income_df
+    else:
+        totals_curr, totals_prev = (wide.xs(p, axis=1, level=1).reset_index() for p in (current, previous))
+        income_df, _, _ = income_statement_table(totals_curr[totals_curr["Lines"] > 0],
+                                                 totals_prev[totals_prev["Lines"] > 0], current, previous)
+    return dict(zip(STATEMENT_NAMES, [balance_df, income_df, cash_flow_df]))
@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+
+# Process-wide memo shared by every session: statement tables, rendered HTML, chart PNGs.
+# Standard library only, so importing it keeps lazy modules (utils.charts) light.
+
+
+class LRUCache:
+    """Values by key, least recently used evicted beyond `capacity`, with hit and miss counts.
+
+    Builders run outside the lock, so a slow build never holds up other keys; two callers missing
+    the same key at once both build it and the later value is kept.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key, builder):
+        """The value under `key`, or builder() stored under it."""
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._values[key]
+            self._stats["misses"] += 1
+        value = builder()
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.capacity:
+                self._values.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._values), capacity=self.capacity)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import period_label, totals_by_period
+from utils.balances import account_balance, balances_as_of_periods
+from utils.statement_table import multi_period_table, multi_summary_row
+
+ACTIVITIES = ["Operating Activities", "Investing Activities", "Financing Activities"]
+
+
+def multi_period_statements(cube, balances, periods, annual=False):
+    """Balance sheet, income statement and cash flow with one column per period.
+
+    Periods are months, or calendar years when `annual`. All activity figures come from a single
+    totals_by_period pivot and balances from one slice of the running balance index.
+    """
+    periods = sorted(periods)
+    labels = [period_label(p) for p in periods]
+
+    # ---------------- BALANCE SHEET ----------------
+    closing = balances_as_of_periods(balances, periods)
+    closing.columns = list(closing.columns[:-len(periods)]) + labels
+    balance_df, _ = multi_period_table(closing, labels, ["Assets", "Liabilities", "Equity"])
+
+    # ---------------- INCOME STATEMENT ----------------
+    wide = totals_by_period(cube, periods, annual=annual)
+    accounts = wide.index.to_frame(index=False)
+    account_type = accounts["Account Type"].astype(object).to_numpy()
+    account_name = accounts["Account Name"].astype(str).to_numpy()
+    active = (wide["Lines"].to_numpy() > 0).any(axis=1)
+
+    def frame(mask, values):
+        return pd.concat([accounts[mask & active].reset_index(drop=True),
+                          pd.DataFrame(values[mask & active], columns=labels)], axis=1)
+
+    amounts = np.where((account_type == "Revenue")[:, None], wide["Credit"].to_numpy(), -wide["Debit"].to_numpy())
+    income_df, totals = multi_period_table(frame(np.isin(account_type, ["Revenue", "Expense"]), amounts),
+                                           labels, ["Revenue", "Expenses"])
+    zeros = np.zeros(len(periods))
+    net_income = totals.get("Revenue", zeros) - totals.get("Expenses", zeros)
+    income_df.loc[len(income_df)] = multi_summary_row("Net Income", net_income)
+
+    # ---------------- CASH FLOW ----------------
+    not_net_income = ~pd.Series(account_name).str.contains("Net Income", case=False).to_numpy()
+    activity_df, activity_totals = multi_period_table(frame(not_net_income, wide["Net"].to_numpy()),
+                                                      labels, ACTIVITIES, keep_empty=True)
+    net_activities = net_income + sum(activity_totals[a] for a in ACTIVITIES)
+    begin_cash = [account_balance(balances, "Cash at Bank", p - 1) for p in periods]
+    end_cash = [account_balance(balances, "Cash at Bank", p) for p in periods]
+
+    columns = income_df.columns
+    cash_flow_df = pd.concat([
+        pd.DataFrame([multi_summary_row("Net Income", net_income, bolded=False)], columns=columns),
+        activity_df,
+        pd.DataFrame([
+            multi_summary_row("Net Activities", net_activities, bolded=False),
+            multi_summary_row("Beginning Cash at Bank", begin_cash, bolded=False),
+            multi_summary_row("Ending Cash at Bank", end_cash, bolded=False),
+        ], columns=columns),
+    ], ignore_index=True)
+
+    return balance_df, income_df, cash_flow_df
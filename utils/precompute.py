@@ -0,0 +1,63 @@
+import os
+import threading
+
+from utils.data_loader import DATA_FILE, get_monthly_cube
+from utils.statement_memo import data_version, get_statements
+from utils.statements import available_periods
+
+# After a load, one background thread per workbook fills the statement memo with the period pairs
+# reviewers jump between: adjacent months (most recent first) and adjacent years. Pages read
+# through the same memo, so a pair that is not done yet is simply computed on demand.
+PRECOMPUTE_MONTHS = 24
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def adjacent_pairs(periods, limit=None):
+    """(current, previous) for every period and the one before it, most recent first."""
+    pairs = list(zip(periods[1:], periods[:-1]))[::-1]
+    return pairs[:limit] if limit else pairs
+
+
+def _run(path, job, months):
+    try:
+        cube = get_monthly_cube(path)
+        work = [(c, p, False) for c, p in adjacent_pairs(available_periods(cube), months)]
+        work += [(c, p, True) for c, p in adjacent_pairs(available_periods(cube, annual=True))]
+        job["total"] = len(work)
+        for current, previous, annual in work:
+            if job["cancel"].is_set() or data_version(path) != job["version"]:
+                job["state"] = "cancelled"
+                return
+            get_statements(current, previous, annual=annual, path=path)
+            job["done"] += 1
+        job["state"] = "done"
+    except Exception as exc:  # the pages still compute on demand
+        job["state"] = f"failed: {exc}"
+
+
+def start_precompute(path=DATA_FILE, months=PRECOMPUTE_MONTHS):
+    """Start (or keep) the background precompute for the current version of the workbook.
+
+    A running job for an older version of the file is cancelled and replaced. Returns the job's
+    status dict.
+    """
+    version = data_version(path)
+    key = os.path.abspath(path)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and job["version"] == version:
+            return job
+        if job is not None:
+            job["cancel"].set()
+        job = {"version": version, "cancel": threading.Event(), "state": "running", "done": 0, "total": 0}
+        _jobs[key] = job
+    threading.Thread(target=_run, args=(path, job, months), name="statement-precompute", daemon=True).start()
+    return job
+
+
+def precompute_status(path=DATA_FILE):
+    with _jobs_lock:
+        job = _jobs.get(os.path.abspath(path))
+    return None if job is None else {k: job[k] for k in ("state", "done", "total")}
@@ -0,0 +1,116 @@
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+
+# Timing spans around the hot paths (load, aggregate, statements, render).
+# Off unless a page turns them on for its rerun (begin_run) or TB_PROFILE=1 is set for the process;
+# when off, span() hands back one shared no-op context and @timed calls straight through.
+
+PROFILE_DIR = os.environ.get("TB_PROFILE_DIR", ".tb_cache")
+LOG_FILE = os.path.join(PROFILE_DIR, "timings.jsonl")
+ALWAYS_ON = os.environ.get("TB_PROFILE") == "1"
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+
+# ---------------- SPANS ----------------
+def _active():
+    spans = getattr(_local, "spans", None)
+    if spans is None and ALWAYS_ON and not hasattr(_local, "run"):
+        return []  # outside a page run: each span goes straight to the log
+    return spans
+
+
+@contextlib.contextmanager
+def _record(name, spans):
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        entry = {"span": name, "ms": round((time.perf_counter() - start) * 1000, 3), "depth": depth}
+        if hasattr(_local, "run"):
+            spans.append(entry)
+        else:
+            write_log([entry])
+
+
+def span(name):
+    """Context manager timing `name` into the current run; a shared no-op when timing is off."""
+    spans = _active()
+    return _NOOP if spans is None else _record(name, spans)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            spans = _active()
+            if spans is None:
+                return fn(*args, **kwargs)
+            with _record(name, spans):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---------------- RUNS ----------------
+def begin_run(label, enabled=False, profile=False):
+    """Start collecting spans for one page rerun on this thread; `profile` also runs cProfile."""
+    _local.run = {"label": label, "started": datetime.now().isoformat(timespec="milliseconds"),
+                  "start": time.perf_counter()}
+    _local.spans = [] if (enabled or ALWAYS_ON or profile) else None
+    _local.depth = 0
+    _local.profiler = cProfile.Profile() if profile else None
+    if _local.profiler is not None:
+        _local.profiler.enable()
+
+
+def end_run():
+    """Finish the rerun: returns (spans, cProfile dump path or None) and appends the spans to the log."""
+    run = getattr(_local, "run", None)
+    spans, profiler = getattr(_local, "spans", None), getattr(_local, "profiler", None)
+    for attr in ("run", "spans", "profiler"):
+        if hasattr(_local, attr):
+            delattr(_local, attr)
+    if run is None:
+        return None, None
+
+    dump = None
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        dump = os.path.join(PROFILE_DIR, f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        profiler.dump_stats(dump)
+    if spans is not None:
+        spans.append({"span": "total", "ms": round((time.perf_counter() - run["start"]) * 1000, 3), "depth": 0})
+        write_log([dict(entry, run=run["label"], started=run["started"]) for entry in spans])
+    return spans, dump
+
+
+def write_log(entries, path=LOG_FILE):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _log_lock, open(path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+    except OSError:  # read-only checkout, timings still show in the panel
+        pass
+
+
+def top_functions(dump, limit=15):
+    out = io.StringIO()
+    pstats.Stats(dump, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
@@ -1,9 +1,16 @@
+from contextlib import contextmanager
+
 import pandas as pd
 import streamlit as st
-import numpy as np
-
-def load_trial_balance():
-    return pd.read_excel("trial_balance_cashflow.xlsx", parse_dates=["Date"])
+from utils.aggregates import period_label
+from utils.data_loader import DATA_FILE, get_line_index
+from utils.drilldown import accounts_with_lines, drilldown, line_range, PAGE_SIZE
+from utils.export_pack import PACK_FORMATS, PACK_MIME, export_pack, pack_pairs, pack_statements
+from utils.charts import chart_cache_stats
+from utils.precompute import precompute_status
+from utils.profiling import begin_run, end_run, top_functions
+from utils.statement_memo import memo_stats
+from utils.validation import SKIPPED, issues
 
 def format_inr(x):
     try:
@@ -11,122 +18,106 @@ def format_inr(x):
     except:
         return ""
 
-def format_percent(x):
+def render_validation_report(report):
+    # Errors above the statements, every check in a collapsed sidebar panel
+    errors = issues(report, severity="error")
+    if errors:
+        st.warning("Data checks: " + "; ".join(r["message"] for r in errors))
+    with st.sidebar.expander("🩺 Data checks", expanded=False):
+        for r in report:
+            if r["severity"] == SKIPPED:
+                st.markdown(f"➖ **{r['check']}** — {r['message']}")
+                continue
+            icon = "✅" if not r["count"] else ("❌" if r["severity"] == "error" else "⚠️")
+            st.markdown(f"{icon} **{r['check']}** — {r['message'] if r['count'] else 'ok'}")
+            if r["count"] and not r["details"].empty:
+                st.dataframe(r["details"].astype(str))
+
+def begin_timing_panel(page):
+    """Opt-in sidebar timings for this rerun; pass the result to end_timing_panel at the end of the page."""
+    with st.sidebar.expander("⏱️ Timings", expanded=False):
+        enabled = st.checkbox("Record timings", key="record_timings")
+        profile = st.button("Profile this rerun (cProfile)")
+        placeholder = st.empty()
+    begin_run(page, enabled=enabled, profile=profile)
+    return placeholder
+
+def end_timing_panel(placeholder):
+    spans, dump = end_run()
+    if spans is None:
+        return
+    with placeholder.container():
+        timings = pd.DataFrame(spans)
+        timings["span"] = ["\u2003" * depth + name for depth, name in zip(timings["depth"], timings["span"])]
+        st.dataframe(timings[["span", "ms"]])
+        memo = memo_stats()
+        st.caption(f"Statement memo: {memo['hits']} hits, {memo['misses']} misses, "
+                   f"{memo['size']}/{memo['capacity']} entries")
+        charts = chart_cache_stats()
+        st.caption(f"Chart cache: {charts['hits']} hits, {charts['misses']} misses, "
+                   f"{charts['size']}/{charts['capacity']} entries")
+        precompute = precompute_status()
+        if precompute is not None:
+            st.caption(f"Statement precompute: {precompute['state']}, "
+                       f"{precompute['done']}/{precompute['total']} period pairs")
+        if dump:
+            st.caption(f"cProfile dump: {dump}")
+            st.code(top_functions(dump))
+
+@contextmanager
+def timing_panel(page):
+    """Wrap a page's body: the run is closed (profiler stopped, dump written) even when the page
+    calls st.stop() or raises."""
+    placeholder = begin_timing_panel(page)
     try:
-        return f"{x:.1f}%"
-    except:
-        return ""
-
-def styled_table_html(df):
-    html = df.to_html(escape=False, index=False)
-    style = """
-    <style>
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            font-family: sans-serif;
-        }
-        th {
-            background-color: #003366;
-            color: white;
-            padding: 8px;
-            text-align: center;
-        }
-        td {
-            padding: 8px;
-        }
-        td:first-child {
-            text-align: left;
-        }
-        td:not(:first-child) {
-            text-align: center;
-        }
-        tbody tr:nth-child(even) {background-color: #f0f8ff;}
-        tbody tr:nth-child(odd) {background-color: white;}
-    </style>
+        yield
+    finally:
+        end_timing_panel(placeholder)
+
+def render_export_pack(periods, annual=False, path=DATA_FILE):
+    """Sidebar panel that builds the statements for a range of periods as XLSX / HTML / PDF downloads."""
+    if len(periods) < 2:
+        return
+    label = "Years" if annual else "Months"
+    with st.sidebar.expander("📦 Export pack", expanded=False):
+        first, last = st.select_slider(label, periods[1:], value=(periods[1], periods[-1]),
+                                       format_func=period_label, key=f"pack_range_{annual}")
+        formats = st.multiselect("Formats", PACK_FORMATS, default=PACK_FORMATS, key=f"pack_formats_{annual}")
+        request = (path, annual, first, last, tuple(formats))
+        if st.button("Build pack", key=f"pack_build_{annual}"):
+            pack = pack_statements(pack_pairs(periods, first, last), annual=annual, path=path)
+            st.session_state["export_pack"] = (request, export_pack(pack, formats))
+        built = st.session_state.get("export_pack")
+        if built and built[0] == request:
+            name = f"statements {period_label(first)} - {period_label(last)}"
+            for fmt, data in built[1].items():
+                st.download_button(f"Download {fmt.upper()}", data, file_name=f"{name}.{fmt}",
+                                   mime=PACK_MIME[fmt], key=f"pack_download_{fmt}")
+
+def render_drilldown(periods, default, annual=False, path=DATA_FILE):
+    """Journal lines behind one account's figure for one period, a page at a time.
+
+    The line index is only built once the viewer asks for it, and not at all for streamed workbooks.
     """
-    return style + html
-
-def render_grouped_table(df, title):
-    st.markdown(f"<h4 style='text-align:center'>{title}</h4>", unsafe_allow_html=True)
-    st.markdown(styled_table_html(df), unsafe_allow_html=True)
-
-def print_js_button(text):
-    st.markdown(f"<button onclick='window.print()'>{text}</button>", unsafe_allow_html=True)
-
-def generate_statement(df, current_period, previous_period, sections):
-    df["Month"] = df["Date"].dt.to_period("M")
-    df_curr = df[df["Month"] == current_period]
-    df_prev = df[df["Month"] == previous_period]
-
-    curr = df_curr.groupby(["Account Category", "Account Name"]).agg({"Debit": "sum", "Credit": "sum"}).reset_index()
-    prev = df_prev.groupby(["Account Category", "Account Name"]).agg({"Debit": "sum", "Credit": "sum"}).reset_index()
-
-    curr["Amount"] = curr["Credit"] - curr["Debit"]  # Revenue = positive, Expenses = negative
-    prev["Amount"] = prev["Credit"] - prev["Debit"]
-
-    merged = pd.merge(curr[["Account Category", "Account Name", "Amount"]],
-                      prev[["Account Category", "Account Name", "Amount"]],
-                      on=["Account Category", "Account Name"],
-                      how="outer", suffixes=("_Current", "_Previous")).fillna(0)
-
-    merged["₹ Change"] = merged["Amount_Current"] - merged["Amount_Previous"]
-    merged["% Change"] = np.where(
-        merged["Amount_Previous"] != 0,
-        merged["₹ Change"] / merged["Amount_Previous"] * 100,
-        0
-    )
-
-    rows = []
-    net_income_current = net_income_previous = 0
-
-    for section in sections:
-        section_df = merged[merged["Account Category"] == section]
-        if section_df.empty:
-            continue
-
-        rows.append([f"<b>{section}</b>", "", "", "", ""])
-        total_current = total_previous = 0
-
-        for _, row in section_df.iterrows():
-            rows.append([
-                row["Account Name"],
-                format_inr(row["Amount_Current"]),
-                format_inr(row["Amount_Previous"]),
-                format_inr(row["₹ Change"]),
-                format_percent(row["% Change"])
-            ])
-            total_current += row["Amount_Current"]
-            total_previous += row["Amount_Previous"]
-
-        rows.append([
-            f"<b>Total {section}</b>",
-            f"<b>{format_inr(total_current)}</b>",
-            f"<b>{format_inr(total_previous)}</b>",
-            f"<b>{format_inr(total_current - total_previous)}</b>",
-            f"<b>{format_percent((total_current - total_previous)/total_previous*100) if total_previous else ''}</b>"
-        ])
-
-        if section == "Revenue":
-            net_income_current += total_current
-            net_income_previous += total_previous
-        elif section == "Expenses":
-            net_income_current -= total_current
-            net_income_previous -= total_previous
-
-    rows.append([
-        "<b>Net Income</b>",
-        f"<b>{format_inr(net_income_current)}</b>",
-        f"<b>{format_inr(net_income_previous)}</b>",
-        f"<b>{format_inr(net_income_current - net_income_previous)}</b>",
-        f"<b>{format_percent((net_income_current - net_income_previous)/net_income_previous) if net_income_previous else ''}</b>"
-    ])
-
-    df_result = pd.DataFrame(rows, columns=[
-        "Account Name",
-        f"Amount ({current_period.strftime('%b %Y')})",
-        f"Amount ({previous_period.strftime('%b %Y')})",
-        "₹ Change",
-        "% Change"
-    ])
-    return df_result, net_income_current, net_income_previous
+    label = "Year" if annual else "Month"
+    with st.expander("🔎 Drill down to journal lines", expanded=False):
+        if not st.checkbox("Show journal lines", key=f"drill_on_{annual}"):
+            return
+        index = get_line_index(path)
+        if index is None:
+            st.info("Drill-down is off for this workbook: it is too large to hold in memory and is read in chunks.")
+            return
+        account_col, period_col, page_col = st.columns(3)
+        account = account_col.selectbox("Account", accounts_with_lines(index), key=f"drill_account_{annual}")
+        choices = periods[::-1]
+        period = period_col.selectbox(label, choices, index=choices.index(default), format_func=period_label,
+                                      key=f"drill_period_{annual}")
+        start, stop = line_range(index, account, period)
+        pages = max(-(-(stop - start) // PAGE_SIZE), 1)
+        # Keyed on the selection so the page resets when the account or period changes
+        page = page_col.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                                     key=f"drill_page_{annual}_{account}_{period}")
+        rows, summary = drilldown(index, account, period, page)
+        st.caption(f"{summary['count']:,} lines · Debit {format_inr(summary['debit'])} · "
+                   f"Credit {format_inr(summary['credit'])} · page {page} of {summary['pages']}")
+        st.dataframe(rows.set_index("Row"))
@@ -0,0 +1,36 @@
+from utils.data_loader import DATA_FILE, file_signature, get_balance_index, get_monthly_cube, read_only_view
+from utils.lru import LRUCache
+from utils.statements import multi_period, statements
+
+# Finished statement tables, shared by every session of the process. Keys start with the
+# workbook's signature (path, mtime, size), so a new version of the file never hits an old entry;
+# entries for old versions simply age out of the LRU.
+MEMO_SIZE = 256
+
+_memo = LRUCache(MEMO_SIZE)
+
+
+def _views(tables):
+    # Callers can't write through to the shared tables
+    return {title: read_only_view(table) for title, table in tables.items()}
+
+
+def data_version(path=DATA_FILE):
+    return file_signature(path)
+
+
+def get_statements(current, previous, annual=False, path=DATA_FILE):
+    """statements() for the workbook at `path`, memoized by data version and period pair."""
+    key = (data_version(path), "statements", current, previous, annual)
+    return _views(_memo.get(key, lambda: statements(get_monthly_cube(path), get_balance_index(path),
+                                                   current, previous, annual=annual)))
+
+
+def get_multi_period(periods, annual=False, path=DATA_FILE):
+    key = (data_version(path), "multi_period", tuple(periods), annual)
+    return _views(_memo.get(key, lambda: multi_period(get_monthly_cube(path), get_balance_index(path),
+                                                     list(periods), annual=annual)))
+
+
+def memo_stats():
+    return _memo.stats()
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+# Statement tables hold numbers: an "Account Name" label column, then float amounts and the % change
+# in percent, NaN where a cell is blank. Rows whose label is in <b> (section headers, totals, Net
+# Income) are shown bold; display_table formats a table for the pages, HTML and PDF.
+PCT_COLUMN = "% Change"
+
+
+def statement_columns(label_current, label_previous):
+    return ["Account Name", f"Amount ({label_current})", f"Amount ({label_previous})", "₹ Change", PCT_COLUMN]
+
+
+def merge_current_previous(curr, prev, value="Net", keys=("Account Category", "Account Name")):
+    keys = list(keys)
+    return pd.merge(curr[keys + [value]].rename(columns={value: "Current"}),
+                    prev[keys + [value]].rename(columns={value: "Previous"}),
+                    on=keys, how="outer").fillna({"Current": 0, "Previous": 0})
+
+
+# ---------------- VECTORIZED FORMATTING ----------------
+def format_inr_array(values):
+    # Same as format_inr: truncate towards zero, thousands separators
+    ints = np.trunc(np.asarray(values, dtype="float64")).astype("int64")
+    return np.array(list(map("₹{:,}".format, ints.tolist())), dtype=object)
+
+
+def format_pct_array(values):
+    return np.array(list(map("{:.1f}%".format, np.asarray(values, dtype="float64").tolist())), dtype=object)
+
+
+def pct_change(current, previous):
+    current = np.asarray(current, dtype="float64")
+    previous = np.asarray(previous, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous != 0, (current - previous) / previous * 100, 0)
+
+
+def bold_rows(table):
+    return table.iloc[:, 0].astype(str).str.startswith("<b>").to_numpy()
+
+
+def display_table(table):
+    """The table as the pages show it: amounts in whole rupees (truncated), the % change to one
+    decimal, blanks empty and the figures of bold rows in <b>."""
+    shown = table.astype(object)
+    bolded = bold_rows(table)
+    for column in table.columns[1:]:
+        values = table[column].to_numpy(dtype="float64")
+        fmt = format_pct_array if column == PCT_COLUMN else format_inr_array
+        text = np.where(np.isnan(values), "", fmt(np.nan_to_num(values)))
+        shown[column] = np.where(bolded & (text != ""), "<b>" + text.astype(object) + "</b>", text)
+    return shown
+
+
+def summary_row(label, current, previous, blank_pct=False, bolded=True):
+    """A single Net Income / Net Activities style row."""
+    pct = np.nan if blank_pct and not previous else float(pct_change([current], [previous])[0])
+    return [f"<b>{label}</b>" if bolded else label, current, previous, current - previous, pct]
+
+
+# ---------------- STATEMENT TABLE ----------------
+def _section_lines(frame, value_columns, section_order, section_col):
+    # Line items grouped by section rank (stable, so input order is kept within a section)
+    rank = {section: i for i, section in enumerate(section_order)}
+    lines = frame[frame[section_col].isin(section_order)]
+    line_rank = lines[section_col].map(rank).astype("int64").to_numpy()
+    order = np.argsort(line_rank, kind="stable")
+    line_rank = line_rank[order]
+    names = lines["Account Name"].astype(object).to_numpy()[order]
+    values = lines[value_columns].to_numpy(dtype="float64")[order].reshape(len(order), len(value_columns))
+    totals = np.column_stack([np.bincount(line_rank, weights=values[:, i], minlength=len(section_order))
+                              for i in range(len(value_columns))]) if value_columns else None
+    return line_rank, names, values, totals
+
+
+def _interleave(section_order, present, line_rank, line_cells, total_cells, columns):
+    # Header (0), lines (1) and total (2) of each section, sections in `section_order`
+    sections = np.array(section_order, dtype=object)[present]
+    header_cells = np.empty((len(present), len(columns)), dtype=object)
+    header_cells[:] = np.nan
+    header_cells[:, 0] = [f"<b>{s}</b>" for s in sections]
+    cells = np.concatenate([header_cells, line_cells, total_cells])
+    keys_rank = np.concatenate([present, line_rank, present])
+    keys_kind = np.concatenate([np.zeros(len(present)), np.ones(len(line_rank)), np.full(len(present), 2)])
+    table = pd.DataFrame(cells[np.lexsort((keys_kind, keys_rank))], columns=columns)
+    return table.astype({column: "float64" for column in columns[1:]})
+
+
+def statement_table(merged, section_order, label_current, label_previous,
+                    section_col="Account Category", keep_empty=False, blank_total_pct=True):
+    """Lay out a merged Current/Previous frame as header, line items and total per section.
+
+    `merged` needs `section_col`, "Account Name", "Current" and "Previous"; line items keep
+    their order within a section. Sections without lines are skipped unless `keep_empty`.
+    A total's % change is blank when the previous total is zero, or 0.0% unless `blank_total_pct`.
+    Returns the table and {section: (current, previous)} totals.
+    """
+    line_rank, names, values, totals = _section_lines(merged, ["Current", "Previous"], section_order, section_col)
+    curr, prev = values[:, 0], values[:, 1]
+    present = np.arange(len(section_order)) if keep_empty else np.unique(line_rank)
+
+    line_cells = np.column_stack([
+        names,
+        curr,
+        prev,
+        curr - prev,
+        pct_change(curr, prev),
+    ]) if len(curr) else np.empty((0, 5), dtype=object)
+
+    t_curr, t_prev = totals[present, 0], totals[present, 1]
+    t_pct = pct_change(t_curr, t_prev)
+    if blank_total_pct:
+        t_pct = np.where(t_prev != 0, t_pct, np.nan)
+    total_cells = np.column_stack([
+        np.array([f"<b>Total {section_order[i]}</b>" for i in present], dtype=object),
+        t_curr,
+        t_prev,
+        t_curr - t_prev,
+        t_pct,
+    ]) if len(present) else np.empty((0, 5), dtype=object)
+
+    table = _interleave(section_order, present, line_rank, line_cells, total_cells,
+                        statement_columns(label_current, label_previous))
+    return table, {section_order[i]: (float(totals[i, 0]), float(totals[i, 1])) for i in present}
+
+
+# ---------------- MULTI-PERIOD TABLE ----------------
+def multi_period_table(frame, labels, section_order, section_col="Account Category", keep_empty=False):
+    """Like statement_table, with one amount column per entry of `labels` and no change columns.
+
+    Returns the table and {section: array of per-period totals}.
+    """
+    line_rank, names, values, totals = _section_lines(frame, list(labels), section_order, section_col)
+    present = np.arange(len(section_order)) if keep_empty else np.unique(line_rank)
+    columns = ["Account Name"] + [f"Amount ({label})" for label in labels]
+
+    line_cells = np.column_stack([names] + [values[:, i] for i in range(len(labels))]) \
+        if len(names) else np.empty((0, len(columns)), dtype=object)
+    total_cells = np.column_stack(
+        [np.array([f"<b>Total {section_order[i]}</b>" for i in present], dtype=object)]
+        + [totals[present, i] for i in range(len(labels))]
+    ) if len(present) else np.empty((0, len(columns)), dtype=object)
+
+    table = _interleave(section_order, present, line_rank, line_cells, total_cells, columns)
+    return table, {section_order[i]: totals[i] for i in present}
+
+
+def multi_summary_row(label, values, bolded=True):
+    return [f"<b>{label}</b>" if bolded else label] + [float(v) for v in values]
@@ -0,0 +1,76 @@
+import numpy as np
+
+from utils.aggregates import period_label, period_totals
+from utils.balances import balances_as_of
+from utils.cashflow_logic import compute_cash_flow_statement
+from utils.multi_period import multi_period_statements
+from utils.profiling import timed
+from utils.statement_table import merge_current_previous, statement_table, summary_row
+
+# Streamlit-free statement engine shared by the pages and batch jobs.
+# Periods are months (pd.Period) or calendar years (int) when `annual`.
+
+BALANCE_SECTIONS = ["Assets", "Liabilities", "Equity"]
+STATEMENT_NAMES = ["Balance Sheet", "Income Statement", "Cash Flow Statement"]
+
+
+# ---------------- BALANCE SHEET ----------------
+@timed("statement: balance sheet")
+def balance_sheet(balances, current, previous, section_order=BALANCE_SECTIONS):
+    # Cumulative balances at each period close, not just the period's activity
+    return balance_sheet_table(balances_as_of(balances, current), balances_as_of(balances, previous),
+                               current, previous, section_order)
+
+
+def balance_sheet_table(closing_curr, closing_prev, current, previous, section_order=BALANCE_SECTIONS):
+    merged = merge_current_previous(closing_curr, closing_prev)
+    table, _ = statement_table(merged, section_order, period_label(current), period_label(previous))
+    return table
+
+
+# ---------------- INCOME STATEMENT ----------------
+def income_amounts(totals):
+    totals = totals[totals["Account Type"].isin(["Revenue", "Expense"])]
+    return totals.assign(Amount=np.where(totals["Account Type"] == "Revenue", totals["Credit"], -totals["Debit"]))
+
+
+@timed("statement: income statement")
+def income_statement(cube, current, previous):
+    return income_statement_table(period_totals(cube, current), period_totals(cube, previous), current, previous)
+
+
+def income_statement_table(totals_curr, totals_prev, current, previous):
+    merged = merge_current_previous(income_amounts(totals_curr), income_amounts(totals_prev), value="Amount")
+    table, totals = statement_table(merged, ["Revenue", "Expenses"], period_label(current), period_label(previous))
+
+    rev_curr, rev_prev = totals.get("Revenue", (0, 0))
+    exp_curr, exp_prev = totals.get("Expenses", (0, 0))
+    net_curr = rev_curr - exp_curr
+    net_prev = rev_prev - exp_prev
+    table.loc[len(table)] = summary_row("Net Income", net_curr, net_prev)
+
+    return table, float(net_curr), float(net_prev)
+
+
+# ---------------- ALL STATEMENTS ----------------
+def statements(cube, balances, current, previous, annual=False):
+    """The three statements for one period pair, as the Financials/Yearly pages show them."""
+    if annual:
+        # The yearly view shows the income statement built alongside the cash flow
+        income_df, cash_flow_df = compute_cash_flow_statement(cube, current, previous, is_annual=True,
+                                                              balances=balances)
+    else:
+        income_df, _, _ = income_statement(cube, current, previous)
+        _, cash_flow_df = compute_cash_flow_statement(cube, current, previous, is_annual=False, balances=balances)
+    return dict(zip(STATEMENT_NAMES, [balance_sheet(balances, current, previous), income_df, cash_flow_df]))
+
+
+@timed("statement: multi-period")
+def multi_period(cube, balances, periods, annual=False):
+    return dict(zip(STATEMENT_NAMES, multi_period_statements(cube, balances, periods, annual=annual)))
+
+
+def available_periods(cube, annual=False):
+    if annual:
+        return sorted(cube["Month"].dt.year.unique())
+    return sorted(cube["Month"].unique())
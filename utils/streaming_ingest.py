@@ -0,0 +1,69 @@
+import pandas as pd
+
+from utils.aggregates import build_monthly_cube, combine_cubes
+
+COLUMNS = ["Date", "Account Name", "Account Type", "Debit", "Credit"]
+CHUNK_ROWS = 50_000
+
+
+# ---------------- CHUNKED READERS ----------------
+def iter_workbook_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Journal lines of the first sheet, `chunk_rows` at a time, via openpyxl read-only mode."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = [list(header).index(col) for col in COLUMNS]
+        chunk = []
+        for row in rows:
+            if row is None or all(value is None for value in row):
+                continue
+            chunk.append([row[i] if i < len(row) else None for i in positions])
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=COLUMNS)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=COLUMNS)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    yield from pd.read_csv(path, usecols=COLUMNS, chunksize=chunk_rows)
+
+
+def iter_ledger_chunks(path, chunk_rows=CHUNK_ROWS):
+    if path.lower().endswith(".csv"):
+        return iter_csv_chunks(path, chunk_rows)
+    return iter_workbook_chunks(path, chunk_rows)
+
+
+# ---------------- STREAMING AGGREGATION ----------------
+def normalize_chunk(chunk):
+    chunk = chunk.copy()
+    chunk["Date"] = pd.to_datetime(chunk["Date"], errors="coerce")
+    for col in ["Debit", "Credit"]:
+        chunk[col] = pd.to_numeric(chunk[col], errors="coerce").fillna(0).astype("float64")
+    return chunk
+
+
+def stream_monthly_cube(path, chunk_rows=CHUNK_ROWS, on_chunk=None):
+    """build_monthly_cube without holding the ledger: each chunk is folded into the running cube.
+
+    Peak memory is one chunk plus the (month x account) cells seen so far. on_chunk, if given, is
+    called with every normalized chunk, so other per-chunk work can share the same pass.
+    """
+    cube = None
+    for chunk in iter_ledger_chunks(path, chunk_rows):
+        chunk = normalize_chunk(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        partial = build_monthly_cube(chunk)
+        cube = partial if cube is None else combine_cubes([cube, partial])
+    if cube is None:
+        return build_monthly_cube(normalize_chunk(pd.DataFrame(columns=COLUMNS)))
+    return cube
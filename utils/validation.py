@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import category_map
+from utils.compact_ledger import to_paise
+
+# Checks run once per load over the whole ledger (or chunk by chunk for streamed workbooks).
+# A report is a list of {"check", "severity", "count", "message", "details"} dicts, one per check,
+# with count 0 when the check passed; details is a DataFrame of the offending rows or periods.
+# A check that could not run has severity SKIPPED and says why in its message.
+
+ERROR = "error"
+WARNING = "warning"
+SKIPPED = "skipped"
+DETAIL_ROWS = 50
+EMPTY_LEDGER = pd.DataFrame({"Date": pd.to_datetime([]), "Account Name": [], "Account Type": [],
+                             "Debit": [], "Credit": []})
+
+
+# ---------------- PARTIAL STATISTICS ----------------
+def type_counts(types):
+    counts = types.value_counts(dropna=False)
+    counts = counts[counts > 0]
+    counts.index = pd.Index(counts.index.astype(object)).fillna("(blank)")
+    return counts
+
+
+def ledger_stats(df, duplicates=True):
+    """Everything the checks need from one slice of the ledger, in a form that adds across slices.
+
+    The duplicate check keeps a hash per line; without `duplicates` it is left out, so the
+    statistics stay the same size however many slices are added.
+    """
+    months = df["Date"].dt.to_period("M")
+    debit, credit = to_paise(df["Debit"]), to_paise(df["Credit"])
+    negative = (debit < 0) | (credit < 0)
+    return {
+        "rows": len(df),
+        "net_by_month": pd.Series(debit - credit, index=months).groupby(level=0).sum(),
+        "lines_by_type": type_counts(df["Account Type"]),
+        "missing_dates": df[df["Date"].isna()].head(DETAIL_ROWS),
+        "missing_date_count": int(df["Date"].isna().sum()),
+        "negatives": df[negative].head(DETAIL_ROWS),
+        "negative_count": int(negative.sum()),
+        "hashes": pd.util.hash_pandas_object(
+            # Categoricals hash by value, so hashes agree across separately read chunks
+            pd.DataFrame({"Date": df["Date"], "Account Name": df["Account Name"],
+                          "Account Type": df["Account Type"], "Debit": debit, "Credit": credit}),
+            index=False).to_numpy() if duplicates else None,
+    }
+
+
+def combine_stats(parts):
+    parts = list(parts) or [ledger_stats(EMPTY_LEDGER)]
+    return {
+        "rows": sum(p["rows"] for p in parts),
+        "net_by_month": pd.concat([p["net_by_month"] for p in parts]).groupby(level=0).sum(),
+        "lines_by_type": pd.concat([p["lines_by_type"] for p in parts]).groupby(level=0).sum(),
+        "missing_dates": pd.concat([p["missing_dates"] for p in parts]).head(DETAIL_ROWS),
+        "missing_date_count": sum(p["missing_date_count"] for p in parts),
+        "negatives": pd.concat([p["negatives"] for p in parts]).head(DETAIL_ROWS),
+        "negative_count": sum(p["negative_count"] for p in parts),
+        "hashes": (None if any(p["hashes"] is None for p in parts)
+                   else np.concatenate([p["hashes"] for p in parts])),
+    }
+
+
+# ---------------- CHECKS ----------------
+def _result(check, severity, count, message, details):
+    return {"check": check, "severity": severity, "count": int(count), "message": message,
+            "details": details.reset_index(drop=True)}
+
+
+def report_from_stats(stats):
+    report = []
+
+    net = stats["net_by_month"]
+    unbalanced = net[net != 0]
+    report.append(_result(
+        "Debits equal credits", ERROR, len(unbalanced),
+        f"{len(unbalanced)} month(s) where debits and credits differ",
+        pd.DataFrame({"Month": unbalanced.index, "Debit - Credit": unbalanced.to_numpy() / 100})))
+
+    lines = stats["lines_by_type"]
+    unmapped = lines[~lines.index.isin(list(category_map))]
+    report.append(_result(
+        "Account types mapped", ERROR, len(unmapped),
+        f"{len(unmapped)} account type(s) with no statement section; their {int(unmapped.sum())} line(s) "
+        "are left out of every statement",
+        pd.DataFrame({"Account Type": unmapped.index, "Lines": unmapped.to_numpy()})))
+
+    report.append(_result(
+        "Dates present", ERROR, stats["missing_date_count"],
+        f"{stats['missing_date_count']} line(s) without a valid date", stats["missing_dates"]))
+
+    if stats["hashes"] is None:
+        report.append(_result(
+            "No duplicate lines", SKIPPED, 0,
+            "not checked: the workbook is read in chunks, and comparing every line with every "
+            "earlier one would mean keeping a hash per line", pd.DataFrame()))
+    else:
+        duplicated = pd.Series(stats["hashes"]).duplicated(keep="first")
+        report.append(_result(
+            "No duplicate lines", WARNING, duplicated.sum(),
+            f"{int(duplicated.sum())} line(s) repeat an earlier line exactly",
+            pd.DataFrame({"Line": np.flatnonzero(duplicated.to_numpy())[:DETAIL_ROWS] + 2})))
+
+    report.append(_result(
+        "No negative amounts", WARNING, stats["negative_count"],
+        f"{stats['negative_count']} line(s) with a negative debit or credit", stats["negatives"]))
+
+    months = net.index.dropna()
+    if len(months):
+        missing = pd.period_range(months.min(), months.max(), freq="M").difference(months)
+    else:
+        missing = pd.PeriodIndex([], freq="M")
+    report.append(_result(
+        "No gaps between months", WARNING, len(missing),
+        f"{len(missing)} month(s) without any lines", pd.DataFrame({"Month": missing})))
+    return report
+
+
+def validate_ledger(df):
+    """Integrity report for a loaded ledger (see the module comment for its shape)."""
+    return report_from_stats(ledger_stats(df))
+
+
+def issues(report, severity=None):
+    return [r for r in report if r["count"] and (severity is None or r["severity"] == severity)]
@@ -0,0 +1,35 @@
+import threading
+
+# Imported by Home.py, so it stays free of pandas and the rest of utils: everything heavy is
+# imported inside the background thread, after Home has rendered.
+
+_started = set()
+_started_lock = threading.Lock()
+
+
+def _warm(path):
+    from utils.dashboard_data import dashboard_series
+    from utils.data_loader import DATA_FILE, get_balance_index, get_monthly_cube, get_validation_report
+    from utils.precompute import start_precompute
+
+    path = path or DATA_FILE
+    try:
+        get_monthly_cube(path)
+        get_balance_index(path)
+        get_validation_report(path)
+        dashboard_series(path)
+    except OSError:  # no workbook yet, the pages report it
+        return
+    start_precompute(path)
+
+
+def warm_in_background(path=None):
+    """Load the workbook, build its aggregates and start the statement precompute on a daemon thread.
+
+    Runs once per process; pages visited later find everything in the shared caches.
+    """
+    with _started_lock:
+        if path in _started:
+            return
+        _started.add(path)
+    threading.Thread(target=_warm, args=(path,), name="data-warmup", daemon=True).start()